@@ -1,54 +1,124 @@
 import asyncio
+import argparse
+import bisect
 import logging
-from tracemalloc import stop
-import aiofiles
-from typing import AsyncGenerator
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+from typing import List, Optional
+from src.infrastructure.utils import TimestampAdjuster
+from src.infrastructure.logconfig import configure_logging, MODES
 
 logger = logging.getLogger(__name__)
 
 class TCPADSSender:
-    def __init__(self, host: str = '0.0.0.0', port: int = 4001, data_file: str = 'data/ads_data.log'):
+    MODES = ('interval', 'fast', 'realtime', 'speedup', 'rate')
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 4001, data_file: str = 'data/ads_data.log', mode: str = 'interval',
+                 interval: float = 1.0, speed: float = 1.0, rate: float = 1000.0, batch_size: int = 512, loop: bool = True):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown replay mode {mode}, expected one of {self.MODES}")
         self.host = host
         self.port = port
         self.data_file = data_file
+        self.mode = mode
+        self.interval = interval
+        self.speed = speed
+        self.rate = rate
+        self.batch_size = batch_size
+        self.loop = loop
         self.server = None
         self.clients = set()
-        logger.info(f"Initialized TCPADSSender with host: {host}, port: {port}")
-    
+        self.data = b''
+        # byte offset just past each line, and its SBS generated time in seconds from the first line
+        self.ends: List[int] = []
+        self.offsets: List[float] = []
+        logger.info(f"Initialized TCPADSSender with host: {host}, port: {port}, mode: {mode}")
+
+    def load(self) -> None:
+        with open(self.data_file, 'rb') as f:
+            raw = f.read()
+
+        adjuster = TimestampAdjuster()
+        lines = [line.strip() + b'\n' for line in raw.splitlines() if line.strip()]
+        ends, offsets = [], []
+        position, first, last = 0, None, 0.0
+        for line in lines:
+            position += len(line)
+            ends.append(position)
+            parts = line.split(b',', 8)
+            stamp = adjuster.offset_us(parts[6].decode('ascii', errors='ignore'), parts[7].decode('ascii', errors='ignore')) if len(parts) > 8 else None
+            if stamp is not None:
+                first = stamp if first is None else first
+                last = max(last, (stamp - first) / 1_000_000)
+            offsets.append(last)
+
+        self.data = b''.join(lines)
+        self.ends = ends
+        self.offsets = offsets
+        logger.info(f"Loaded {len(lines)} lines ({len(self.data)} bytes) from {self.data_file}, spanning {last:.1f}s of feed time")
+
+    def due(self, index: int) -> float:
+        # seconds after the start of a pass when line index is sent
+        if self.mode == 'realtime':
+            return self.offsets[index]
+        if self.mode == 'speedup':
+            return self.offsets[index] / self.speed
+        if self.mode == 'rate':
+            return index / self.rate
+        if self.mode == 'interval':
+            return index * self.interval
+        return 0.0
+
+    def sendable(self, index: int, elapsed: float) -> int:
+        # index just past the last line due by elapsed, capped to one batch
+        limit = min(index + self.batch_size, len(self.ends))
+        if self.mode == 'fast':
+            return limit
+        if self.mode in ('realtime', 'speedup'):
+            scale = 1.0 if self.mode == 'realtime' else self.speed
+            return max(index, min(limit, bisect.bisect_right(self.offsets, elapsed * scale, index, limit)))
+        if self.mode == 'rate':
+            return max(index, min(limit, int(elapsed * self.rate) + 1))
+        return max(index, min(limit, int(elapsed / self.interval) + 1))
+
     async def start(self) -> None:
+        if not self.ends:
+            self.load()
         self.server = await asyncio.start_server(self.connect_client, self.host, self.port, backlog=100)
         logger.info(f"Started TCPADSSender on {self.host}:{self.port}")
 
         async with self.server:
             await self.server.serve_forever()
-    
+
     async def stop(self) -> None:
         if self.server:
             self.server.close()
         logger.info('Stop ADS Server')
-    
+
     async def connect_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         addr = writer.get_extra_info('peername')
         logger.info(f"Connected client: {addr}")
         self.clients.add(writer)
+        sent = 0
 
         try:
-            async for data in self.read_datafile():
-                if not data.strip():
-                    continue
-                writer.write(data.encode('utf-8'))
-                await writer.drain()
-
-                logger.info(f"Sent ADS-B data to client -> {addr} : {data}")
-                await asyncio.sleep(1)
+            if not self.ends:
+                logger.error(f"File {self.data_file} has no lines to replay")
+                return
+            loop = asyncio.get_running_loop()
+            data = memoryview(self.data)
+            while True:
+                start = loop.time()
+                index = 0
+                while index < len(self.ends):
+                    end = self.sendable(index, loop.time() - start)
+                    if end == index:
+                        await asyncio.sleep(max(0.0, start + self.due(index) - loop.time()))
+                        continue
+                    writer.write(data[self.ends[index - 1] if index else 0:self.ends[end - 1]])
+                    await writer.drain()
+                    sent += end - index
+                    index = end
+                if not self.loop:
+                    break
         except (BrokenPipeError, ConnectionResetError):
             logger.warning(f"Client {addr} disconnected")
         except Exception as e:
@@ -62,29 +132,38 @@ class TCPADSSender:
                 logger.error(f"Error closing writer: {e}")
             finally:
                 self.clients.discard(writer)
-                logger.info(f"Disconnected client: {addr}")
-
-    async def read_datafile(self) -> AsyncGenerator[str, None]:
-        while True:
-            try:
-                async with aiofiles.open(self.data_file, mode='r') as f:
-                    async for line in f:
-                        yield line
-            except FileNotFoundError:
-                logger.error(f"File {self.data_file} not found")
-                await asyncio.sleep(5)
-            except Exception as e:
-                logger.error(f"Error reading datafile: {e}")
-                await asyncio.sleep(5)
+                logger.info(f"Disconnected client: {addr}, sent {sent} lines")
 
-async def main():
-    server = TCPADSSender()
+async def main(args: Optional[argparse.Namespace] = None):
+    if args is None:
+        server = TCPADSSender()
+    else:
+        server = TCPADSSender(
+            args.host, args.port, args.data_file, mode=args.mode, interval=args.interval, speed=args.speed,
+            rate=args.rate, batch_size=args.batch_size, loop=not args.once
+        )
     await server.start()
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Replay an SBS log over TCP')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=4001)
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--mode', choices=TCPADSSender.MODES, default='interval',
+                        help='interval: one line every --interval seconds, fast: as fast as possible, '
+                             'realtime: follow the SBS generated timestamps, speedup: realtime divided by --speed, rate: --rate lines/sec')
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--speed', type=float, default=10.0)
+    parser.add_argument('--rate', type=float, default=1000.0)
+    parser.add_argument('--batch-size', type=int, default=512, help='maximum lines per write')
+    parser.add_argument('--once', action='store_true', help='send the file once instead of looping')
+    parser.add_argument('--log-mode', choices=MODES, default='debug', help='production: INFO and above, written off the event loop')
+    return parser.parse_args()
 
 if __name__ == '__main__':
+    args = parse_args()
+    configure_logging({'mode': args.log_mode})
     try:
-        asyncio.run(main())
+        asyncio.run(main(args))
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received, shutting down...")
-        
\ No newline at end of file
@@ -0,0 +1,182 @@
+from typing import Dict, List, Optional
+from ads_server import TCPADSSender
+from src.infrastructure.settings import SettingsReader
+from src.presentation.app import Application
+import numpy as np
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import time
+
+def bench_settings(feed_port: int, sender_port: int, scheduler: bool, batch_window: Optional[float] = None, pipeline: str = 'inline',
+                   trame_cache: bool = False, logging_mode: Optional[str] = None) -> dict:
+    settings = copy.deepcopy(SettingsReader().settings)
+    settings['ads_receiver_tcp'].update({'host': '127.0.0.1', 'port': feed_port})
+    settings['ads_receiver_tcp'].pop('feeds', None)
+    settings['ais_sender_tcp'].update({'host': '127.0.0.1', 'port': sender_port})
+    if batch_window is not None:
+        settings['ais_sender_tcp']['batch_window'] = batch_window
+    settings.setdefault('ads_receiver_modes', {})['enabled'] = False
+    settings.setdefault('ais_sender_zmq', {})['enabled'] = False
+    settings.setdefault('scheduler', {})['enabled'] = scheduler
+    settings.setdefault('pipeline', {})['mode'] = pipeline
+    # off unless asked for, a cached stream suppresses unchanged states and is not comparable to a full one
+    settings.setdefault('trame_cache', {})['enabled'] = trame_cache
+    if logging_mode is not None:
+        # the Application samples its per-message log lines according to the mode, configure_logging only sets up handlers
+        settings.setdefault('logging', {})['mode'] = logging_mode
+    return settings
+
+class LatencyProbe:
+    # stamps the arrival of each parsed line and carries it to the sentence encoded from that state
+    def __init__(self, app: Application):
+        self.arrivals: Dict[str, float] = {}
+        self.emitted: Dict[str, float] = {}
+        parse_line = app.receiver.parser.parse_line
+        build = app.builder.build_ais_type9_trame
+        build_batch = app.builder.build_ais_type9_batch
+
+        def timed_parse_line(line: bytes):
+            aircraft = parse_line(line)
+            if aircraft is not None:
+                self.arrivals[aircraft.icao] = time.perf_counter()
+            return aircraft
+
+        async def timed_build(aircraft):
+            trame = await build(aircraft)
+            self.emitted[trame.nmea_message] = self.arrivals.get(aircraft.icao, time.perf_counter())
+            return trame
+
+        def timed_build_batch(aircrafts):
+            trames = build_batch(aircrafts)
+            for aircraft, trame in zip(aircrafts, trames):
+                self.emitted[trame.nmea_message] = self.arrivals.get(aircraft.icao, time.perf_counter())
+            return trames
+
+        app.receiver.parser.parse_line = timed_parse_line
+        app.builder.build_ais_type9_trame = timed_build
+        app.builder.build_ais_type9_batch = timed_build_batch
+
+        if app.cache is not None:
+            lookup = app.cache.lookup
+
+            def timed_lookup(icao, fields):
+                # a resent cached sentence belongs to the state that just arrived, not to the one it was encoded from
+                hit, sentence = lookup(icao, fields)
+                if sentence is not None:
+                    self.emitted[sentence] = self.arrivals.get(icao, time.perf_counter())
+                return hit, sentence
+
+            app.cache.lookup = timed_lookup
+
+async def consume(port: int, probe: LatencyProbe, latencies: List[float], counts: List[int], index: int, ready: asyncio.Event) -> None:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    ready.set()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            now = time.perf_counter()
+            counts[index] += 1
+            arrival = probe.emitted.get(line.decode('ascii', errors='ignore').rstrip('\n'))
+            if arrival is not None:
+                latencies.append(now - arrival)
+    finally:
+        writer.close()
+
+async def run(consumers: int = 4, duration: float = 10.0, mode: str = 'fast', rate: float = 5000.0, speed: float = 10.0,
+              scheduler: bool = False, feed_port: int = 14001, sender_port: int = 14002, batch_window: Optional[float] = None,
+              pipeline: str = 'inline', trame_cache: bool = False, logging_mode: Optional[str] = None) -> dict:
+    feed = TCPADSSender('127.0.0.1', feed_port, mode=mode, rate=rate, speed=speed)
+    feed_task = asyncio.create_task(feed.start())
+    app = Application(bench_settings(feed_port, sender_port, scheduler, batch_window, pipeline, trame_cache, logging_mode))
+    probe = LatencyProbe(app)
+    sender_task = asyncio.create_task(app.sender.start())
+    await asyncio.sleep(0.2)
+
+    latencies: List[float] = []
+    counts = [0] * consumers
+    consumer_tasks = []
+    for index in range(consumers):
+        ready = asyncio.Event()
+        consumer_tasks.append(asyncio.create_task(consume(sender_port, probe, latencies, counts, index, ready)))
+        await ready.wait()
+    await asyncio.sleep(0.1)
+
+    app.receiver.register_callback(app.callback)
+    if app.staged:
+        app.staged.start()
+    if app.scheduler:
+        app.scheduler.start()
+    start = time.perf_counter()
+    app.receiver.start()
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - start
+
+    lines = app.receiver.parser.lines
+    delivered = sum(counts)
+    writes = sum(client.writes for client in app.senders[0].clients.values())
+    app.receiver.stop()
+    if app.scheduler:
+        app.scheduler.stop()
+    if app.staged:
+        app.staged.stop()
+    for task in consumer_tasks + [sender_task, feed_task]:
+        task.cancel()
+    await app.sender.stop()
+    await feed.stop()
+    await asyncio.gather(*consumer_tasks, sender_task, feed_task, return_exceptions=True)
+
+    samples = np.array(latencies) * 1000.0 if latencies else np.zeros(1)
+    return {
+        'benchmark': 'end_to_end',
+        'consumers': consumers,
+        'replay_mode': mode,
+        'scheduler': scheduler,
+        'pipeline': pipeline,
+        'trame_cache': trame_cache,
+        'batch_window': app.senders[0].batch_window,
+        'writes': writes,
+        'seconds': elapsed,
+        'input_lines': lines,
+        'input_lines_per_sec': lines / elapsed,
+        'output_sentences': delivered,
+        'output_sentences_per_sec': delivered / elapsed,
+        'output_sentences_per_consumer_per_sec': delivered / consumers / elapsed if consumers else 0.0,
+        'latency_samples': len(latencies),
+        'latency_ms_p50': float(np.percentile(samples, 50)),
+        'latency_ms_p99': float(np.percentile(samples, 99)),
+        'latency_ms_p999': float(np.percentile(samples, 99.9)),
+        'latency_ms_max': float(samples.max())
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='End-to-end replay -> Application -> NMEA consumers benchmark')
+    parser.add_argument('--consumers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--mode', choices=TCPADSSender.MODES, default='fast', help='replay pacing, see ads_server.py')
+    parser.add_argument('--rate', type=float, default=5000.0)
+    parser.add_argument('--speed', type=float, default=10.0)
+    parser.add_argument('--scheduler', action='store_true', help='enable the emission scheduler')
+    parser.add_argument('--feed-port', type=int, default=14001)
+    parser.add_argument('--sender-port', type=int, default=14002)
+    parser.add_argument('--pipeline', choices=('inline', 'staged'), default='inline', help='pipeline.mode')
+    parser.add_argument('--batch-window', type=float, help='override ais_sender_tcp.batch_window, 0 disables batching')
+    parser.add_argument('--trame-cache', action='store_true', help='enable trame_cache, unchanged states are then suppressed')
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    result = asyncio.run(run(args.consumers, args.duration, args.mode, args.rate, args.speed, args.scheduler, args.feed_port, args.sender_port, args.batch_window, args.pipeline,
+                             args.trame_cache))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key:<40} {value:,.3f}" if isinstance(value, float) else f"{key:<40} {value}")
+
+if __name__ == '__main__':
+    main()
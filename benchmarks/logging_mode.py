@@ -0,0 +1,53 @@
+from typing import List, Optional
+from benchmarks import e2e
+from src.infrastructure.logconfig import configure_logging, stop_logging, MODES
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+def run(modes: List[str], log_file: str = os.devnull, consumers: int = 1, duration: float = 10.0, mode: str = 'fast', rate: float = 5000.0,
+        trame_cache: bool = False) -> List[dict]:
+    # same end-to-end run per logging mode, the scheduler is off so every parsed line reaches the per-message log calls
+    results = []
+    stream = sys.stderr if log_file == '-' else open(log_file, 'a')
+    try:
+        for logging_mode in modes:
+            configure_logging({'mode': logging_mode}, stream=stream)
+            result = asyncio.run(e2e.run(consumers, duration, mode, rate, scheduler=False, trame_cache=trame_cache,
+                                        logging_mode=logging_mode))
+            stop_logging()
+            results.append({'benchmark': 'logging_mode', 'logging_mode': logging_mode, 'log_file': log_file,
+                            'trame_cache': trame_cache,
+                            'input_lines_per_sec': result['input_lines_per_sec'],
+                            'output_sentences_per_sec': result['output_sentences_per_sec'],
+                            'latency_ms_p50': result['latency_ms_p50'],
+                            'latency_ms_p99': result['latency_ms_p99']})
+    finally:
+        if stream is not sys.stderr:
+            stream.close()
+    return results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='End-to-end throughput with debug vs production logging')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--log-file', default=os.devnull, help="where log records are written, '-' for stderr (a terminal shows the real cost)")
+    parser.add_argument('--consumers', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--mode', default='fast', help='replay pacing, see ads_server.py')
+    parser.add_argument('--rate', type=float, default=5000.0)
+    parser.add_argument('--trame-cache', action='store_true', help='enable trame_cache, unchanged states are then suppressed')
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args(argv)
+
+    results = run(args.modes, args.log_file, args.consumers, args.duration, args.mode, args.rate, args.trame_cache)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for result in results:
+            print(f"{result['logging_mode']:<12} {result['input_lines_per_sec']:>12,.0f} lines/s {result['output_sentences_per_sec']:>12,.0f} sentences/s "
+                  f"p50 {result['latency_ms_p50']:.3f} ms p99 {result['latency_ms_p99']:.3f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+from typing import Callable, List
+from src.domain.models import Aircraft
+from src.infrastructure.adapters import TCPADSReceiver, AisMessageBuilder
+from src.infrastructure.utils import TimestampAdjuster
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+def measure(name: str, func: Callable[[], int], repeat: int) -> dict:
+    best = float('inf')
+    ops = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = func()
+        best = min(best, time.perf_counter() - start)
+    return {'benchmark': name, 'ops': ops, 'seconds': best, 'ops_per_sec': ops / best, 'ns_per_op': best / ops * 1e9}
+
+def load_lines(data_file: str, copies: int) -> List[str]:
+    with open(data_file, 'r') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return lines * copies
+
+def snapshot_aircrafts(lines: List[str]) -> List[Aircraft]:
+    receiver = TCPADSReceiver('127.0.0.1', 0, adjuster=TimestampAdjuster())
+    snapshots = []
+    for line in lines:
+        aircraft = receiver.parse_aircraft(line)
+        if aircraft is not None and aircraft.valid():
+            snapshots.append(Aircraft(
+                icao=aircraft.icao, callsign=aircraft.callsign, altitude=aircraft.altitude, latitude=aircraft.latitude,
+                longitude=aircraft.longitude, heading=aircraft.heading, speed=aircraft.speed, timestamp=aircraft.timestamp
+            ))
+    return snapshots
+
+def run(data_file: str = 'data/ads_data.log', copies: int = 10, repeat: int = 3) -> List[dict]:
+    lines = load_lines(data_file, copies)
+    stamps = [f"{parts[6]} {parts[7]}" for parts in (line.split(',') for line in lines)]
+    aircrafts = snapshot_aircrafts(lines)
+    builder = AisMessageBuilder()
+    adjuster = TimestampAdjuster()
+
+    def parse() -> int:
+        receiver = TCPADSReceiver('127.0.0.1', 0, adjuster=TimestampAdjuster())
+        for line in lines:
+            receiver.parse_aircraft(line)
+        return len(lines)
+
+    def adjust() -> int:
+        for stamp in stamps:
+            adjuster.adjust(stamp)
+        return len(stamps)
+
+    def build() -> int:
+        async def encode_all() -> None:
+            for aircraft in aircrafts:
+                await builder.build_ais_type9_trame(aircraft)
+        asyncio.run(encode_all())
+        return len(aircrafts)
+
+    def build_batch() -> int:
+        builder.build_ais_type9_batch(aircrafts)
+        return len(aircrafts)
+
+    return [
+        measure('parse_aircraft', parse, repeat),
+        measure('timestamp_adjust', adjust, repeat),
+        measure('build_ais_type9_trame', build, repeat),
+        measure('build_ais_type9_batch', build_batch, repeat)
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Per-stage microbenchmarks')
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--copies', type=int, default=10, help='times the sample log is repeated')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the best one is reported')
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    results = run(args.data_file, args.copies, args.repeat)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for result in results:
+            print(f"{result['benchmark']:<24} {result['ops_per_sec']:>12,.0f} ops/sec {result['ns_per_op']:>10,.0f} ns/op")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+from typing import Dict, Optional
+from src.domain.models import Aircraft
+from src.infrastructure.sbs import SBSParser
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.utils import TimestampAdjuster
+from benchmarks.timestamp import strptime_adjust
+import argparse
+import json
+import logging
+import time
+
+def legacy_parse(text: str, aircrafts: Dict[str, Aircraft], adjuster: TimestampAdjuster) -> Optional[Aircraft]:
+    # readline/decode/split path the receiver used before SBSParser
+    parts = text.strip().split(',')
+    if len(parts) < 22 or not parts[0].startswith('MSG'):
+        return None
+    msg_type = int(parts[1])
+    icao = parts[4].strip()
+    timestamp = strptime_adjust(adjuster, f"{parts[6]} {parts[7]}")
+    callsign = parts[10].strip() or None
+    altitude = int(parts[11]) if parts[11] else None
+    speed = float(parts[12]) if parts[12] else None
+    heading = float(parts[13]) if parts[13] else None
+    latitude = float(parts[14]) if parts[14] else None
+    longitude = float(parts[15]) if parts[15] else None
+    previous = aircrafts.get(icao, Aircraft(icao=icao))
+    aircraft = Aircraft(
+        icao=icao,
+        callsign=callsign if msg_type in (1, 5, 6) and callsign else previous.callsign,
+        altitude=altitude if msg_type in (3, 5, 7) else previous.altitude,
+        latitude=latitude if msg_type in (2, 3) else previous.latitude,
+        longitude=longitude if msg_type in (2, 3) else previous.longitude,
+        heading=heading if msg_type in (2, 4) else previous.heading,
+        speed=speed if msg_type in (2, 4) else previous.speed,
+        timestamp=timestamp
+    )
+    aircrafts[icao] = aircraft
+    return aircraft
+
+def bench_legacy(data: bytes, adjuster: TimestampAdjuster) -> float:
+    aircrafts: Dict[str, Aircraft] = {}
+    lines = data.splitlines(keepends=True)
+    start = time.perf_counter()
+    for line in lines:
+        text = line.decode('utf-8', errors='ignore').strip()
+        if text:
+            legacy_parse(text, aircrafts, adjuster)
+    return time.perf_counter() - start
+
+def bench_chunked(data: bytes, adjuster: TimestampAdjuster, chunk_size: int) -> float:
+    parser = SBSParser(AircraftStore(max_size=100000), adjuster)
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk_size):
+        parser.parse_many(data[offset:offset + chunk_size])
+    parser.parse_many(b'\n')
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='SBS parser microbenchmark')
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--repeat', type=int, default=40, help='times the sample log is concatenated')
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with open(args.data_file, 'rb') as f:
+        sample = f.read()
+    data = sample * args.repeat
+    lines = sum(1 for line in data.splitlines() if line.strip())
+    adjuster = TimestampAdjuster()
+
+    legacy = bench_legacy(data, adjuster)
+    chunked = bench_chunked(data, adjuster, args.chunk_size)
+    report = {
+        'lines': lines,
+        'legacy_lines_per_sec': lines / legacy,
+        'chunked_lines_per_sec': lines / chunked,
+        'speedup': legacy / chunked
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"lines:             {lines}")
+        print(f"legacy readline:   {report['legacy_lines_per_sec']:,.0f} lines/sec")
+        print(f"chunked parser:    {report['chunked_lines_per_sec']:,.0f} lines/sec")
+        print(f"speedup:           {report['speedup']:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+from benchmarks import e2e, micro
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import time
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run the microbenchmarks and the end-to-end benchmark, print one JSON report')
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--consumers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--mode', default='fast', help='replay pacing for the end-to-end run, see ads_server.py')
+    parser.add_argument('--rate', type=float, default=5000.0)
+    parser.add_argument('--output', help='also write the report to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'micro': micro.run(args.data_file),
+        'end_to_end': [
+            asyncio.run(e2e.run(args.consumers, args.duration, args.mode, args.rate)),
+            asyncio.run(e2e.run(args.consumers, args.duration, 'rate', args.rate))
+        ]
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
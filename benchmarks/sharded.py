@@ -0,0 +1,61 @@
+from src.infrastructure.sharding import ShardedPipeline
+import argparse
+import json
+import logging
+import os
+import time
+
+def synthetic_feed(data_file: str, copies: int) -> bytes:
+    # the sample log with the ICAO prefix rewritten per copy, so there are copies * 9 distinct aircraft
+    with open(data_file, 'rb') as f:
+        sample = f.read()
+    return b''.join(sample.replace(b',E80', b',%03X' % (0x100 + copy)) for copy in range(copies))
+
+def run(data: bytes, workers: int, chunk_size: int) -> dict:
+    pipeline = ShardedPipeline('127.0.0.1', 0, sender=None, workers=workers)
+    pipeline.start_workers()
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(data), chunk_size):
+            for inbox, lines in zip(pipeline.inboxes, pipeline.route(data[offset:offset + chunk_size])):
+                if lines:
+                    inbox.put(b'\n'.join(lines))
+        for inbox in pipeline.inboxes:
+            inbox.put(None)
+
+        sentences = 0
+        finished = 0
+        while finished < workers:
+            _, batch = pipeline.outbox.get()
+            if batch is None:
+                finished += 1
+            else:
+                sentences += len(batch)
+        elapsed = time.perf_counter() - start
+    finally:
+        for process in pipeline.processes:
+            process.join(5)
+    return {'workers': workers, 'lines': pipeline.lines, 'sentences': sentences, 'seconds': elapsed, 'lines_per_sec': pipeline.lines / elapsed}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Sharded pipeline scaling benchmark')
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--copies', type=int, default=40, help='copies of the sample log, each with its own aircraft')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    data = synthetic_feed(args.data_file, args.copies)
+    results = [run(data, workers, args.chunk_size) for workers in range(1, args.max_workers + 1)]
+    if args.json:
+        print(json.dumps({'cpu_count': os.cpu_count(), 'results': results}))
+    else:
+        base = results[0]['lines_per_sec']
+        print(f"cpu count: {os.cpu_count()}")
+        for result in results:
+            print(f"workers {result['workers']:>2}: {result['lines_per_sec']:>10,.0f} lines/sec  {result['sentences']:>8} sentences  {result['lines_per_sec'] / base:.2f}x")
+
+if __name__ == '__main__':
+    main()
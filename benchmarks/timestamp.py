@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import List, Tuple
+from src.infrastructure.utils import TimestampAdjuster
+import argparse
+import json
+import logging
+import time
+
+def strptime_adjust(adjuster: TimestampAdjuster, str_timestamp: str) -> datetime:
+    # conversion TimestampAdjuster.adjust did before the cached fast path
+    try:
+        return adjuster.start_time + (datetime.strptime(str_timestamp, "%Y/%m/%d %H:%M:%S.%f") - adjuster.base_epoch)
+    except ValueError:
+        return adjuster.start_time
+
+def load_pairs(data_file: str) -> List[Tuple[str, str]]:
+    pairs = []
+    with open(data_file, 'r') as f:
+        for line in f:
+            parts = line.strip().split(',')
+            if len(parts) >= 10:
+                pairs.append((parts[6], parts[7]))
+                pairs.append((parts[8], parts[9]))
+    return pairs
+
+def measure(func, pairs: List[Tuple[str, str]]) -> float:
+    start = time.perf_counter()
+    for date, clock in pairs:
+        func(date, clock)
+    return len(pairs) / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='TimestampAdjuster microbenchmark, correctness is covered by tests/test_timestamp.py')
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    adjuster = TimestampAdjuster()
+    pairs = load_pairs(args.data_file) * args.repeat
+    report = {
+        'timestamps': len(pairs),
+        'strptime_per_sec': measure(lambda d, t: strptime_adjust(adjuster, f"{d} {t}"), pairs),
+        'datetime_per_sec': measure(adjuster.adjust_parts, pairs),
+        'float_per_sec': measure(lambda d, t: adjuster.adjust_parts(d, t, output='float'), pairs),
+        'int_per_sec': measure(lambda d, t: adjuster.adjust_parts(d, t, output='int'), pairs)
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"timestamps:        {report['timestamps']:,}")
+        print(f"strptime:          {report['strptime_per_sec']:,.0f} /sec")
+        print(f"cached datetime:   {report['datetime_per_sec']:,.0f} /sec")
+        print(f"cached epoch float:{report['float_per_sec']:,.0f} /sec")
+        print(f"cached epoch int:  {report['int_per_sec']:,.0f} /sec")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from typing import List, Optional
+from src.infrastructure.sbs import SBSParser
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.tracklog import TrackLogReader, TrackLogWriter
+from src.infrastructure.utils import TimestampAdjuster
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+def run(data_file: str = 'data/ads_data.log', repeat: int = 20) -> dict:
+    # the same aircraft states read back from SBS text and from the binary track log
+    with open(data_file, 'rb') as f:
+        lines = [line.strip() for line in f] * repeat
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'track.log')
+        store = AircraftStore()
+        parser = SBSParser(store, TimestampAdjuster())
+        writer = TrackLogWriter(path)
+        store.listeners.append(writer.append)
+        writer.open()
+        started = time.perf_counter()
+        for line in lines:
+            parser.parse_line(line)
+        parse_seconds = time.perf_counter() - started
+        writer.flush()
+        writer.file.close()
+
+        started = time.perf_counter()
+        reader = TrackLogReader(path)
+        states = len(reader)
+        columns = reader.records[['latitude', 'longitude', 'altitude']].copy()
+        load_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        aircraft = sum(1 for _ in reader)
+        iterate_seconds = time.perf_counter() - started
+        size = os.path.getsize(path)
+        del columns
+        reader.close()
+
+    return {
+        'benchmark': 'track_log',
+        'sbs_lines': len(lines),
+        'sbs_bytes': sum(len(line) + 1 for line in lines),
+        'states': states,
+        'track_log_bytes': size,
+        'sbs_parse_states_per_sec': states / parse_seconds,
+        'track_log_columns_states_per_sec': states / load_seconds,
+        'track_log_aircraft_per_sec': aircraft / iterate_seconds
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='SBS parsing vs track log reads for the same aircraft states')
+    parser.add_argument('--data-file', default='data/ads_data.log')
+    parser.add_argument('--repeat', type=int, default=20, help='times the data file is repeated')
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    result = run(args.data_file, args.repeat)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key:<40} {value:,.3f}" if isinstance(value, float) else f"{key:<40} {value}")
+
+if __name__ == '__main__':
+    main()
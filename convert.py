@@ -0,0 +1,161 @@
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from src.infrastructure.adapters import AisMessageBuilder
+from src.infrastructure.sbs import SBSParser, ICAO
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.utils import TimestampAdjuster
+import numpy as np
+import argparse
+import logging
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+class FeedClockAdjuster(TimestampAdjuster):
+    # the store ages aircraft out on feed time, as it would if the file were replayed in real time
+    def __init__(self, start_time: Optional[datetime] = None):
+        super().__init__(start_time)
+        self.now = 0.0
+
+    def adjust_parts(self, date: str, time: str, output: str = 'datetime') -> Union[datetime, float, int]:
+        value = super().adjust_parts(date, time, output)
+        self.now = value.timestamp() if output == 'datetime' else value
+        return value
+
+# every valid state is encoded, like Application in inline mode with scheduler and trame_cache disabled, the
+# shipped settings enable both and then emit at most one sentence per aircraft per interval / unchanged state
+class Converter:
+    def __init__(self, start_time: datetime, ttl: float = 300.0, max_size: int = 10000, shard: int = 0, shards: int = 1):
+        self.adjuster = FeedClockAdjuster(start_time)
+        self.store = AircraftStore(ttl=ttl, max_size=max_size, clock=lambda: self.adjuster.now)
+        self.parser = SBSParser(self.store, self.adjuster)
+        self.builder = AisMessageBuilder()
+        self.shard = shard
+        self.shards = shards
+
+    def convert(self, block: bytes) -> Tuple[List[int], List[bytes]]:
+        # (line index within the block, sentence) for the lines of this converter's shard
+        indices: List[int] = []
+        sentences: List[bytes] = []
+        parse_line = self.parser.parse_line
+        encode = self.builder.encode_type9
+        shards, shard = self.shards, self.shard
+        for index, line in enumerate(block.split(b'\n')):
+            if shards > 1:
+                parts = line.split(b',', ICAO + 1)
+                if len(parts) <= ICAO or zlib.crc32(parts[ICAO].strip()) % shards != shard:
+                    continue
+            aircraft = parse_line(line.strip())
+            if aircraft is not None and aircraft.valid():
+                indices.append(index)
+                sentences.append(f'{encode(aircraft)}\n'.encode('ascii'))
+        return indices, sentences
+
+def blocks(data: mmap.mmap, block_size: int) -> Iterator[Tuple[int, int]]:
+    # byte ranges ending on a newline
+    start, size = 0, len(data)
+    while start < size:
+        end = data.find(b'\n', min(start + block_size, size) - 1)
+        end = size if end == -1 else end + 1
+        yield start, end
+        start = end
+
+def convert_worker(path: str, start_time: datetime, ttl: float, max_size: int, shard: int, shards: int,
+                   inbox: multiprocessing.Queue, outbox: multiprocessing.Queue) -> None:
+    converter = Converter(start_time, ttl, max_size, shard, shards)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while True:
+            task = inbox.get()
+            if task is None:
+                break
+            block, start, end = task
+            indices, sentences = converter.convert(data[start:end])
+            outbox.put((block, np.array(indices, dtype=np.int64), b''.join(sentences)))
+
+def convert(path: str, output: BinaryIO, start_time: datetime, workers: int = 1, block_size: int = 16 * 1024 * 1024,
+            ttl: float = 300.0, max_size: int = 10000, in_flight: int = 4) -> int:
+    written = 0
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            spans = list(blocks(data, block_size))
+            if workers <= 1:
+                converter = Converter(start_time, ttl, max_size)
+                for start, end in spans:
+                    _, sentences = converter.convert(data[start:end])
+                    output.writelines(sentences)
+                    written += len(sentences)
+                return written
+
+    # every worker owns the ICAOs hashed to it and reads the blocks itself through mmap,
+    # the per block results are merged back into input line order
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    outbox = context.Queue()
+    processes = [
+        context.Process(target=convert_worker, args=(path, start_time, ttl, max_size, shard, workers, inboxes[shard], outbox), daemon=True)
+        for shard in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def submit(block: int) -> None:
+        if block < len(spans):
+            for inbox in inboxes:
+                inbox.put((block, *spans[block]))
+
+    try:
+        for block in range(in_flight):
+            submit(block)
+        results: Dict[int, List[Tuple[np.ndarray, bytes]]] = {}
+        for block in range(len(spans)):
+            while len(results.get(block, ())) < workers:
+                done, indices, sentences = outbox.get()
+                results.setdefault(done, []).append((indices, sentences))
+            # at most in_flight blocks are buffered, however uneven the shards are
+            submit(block + in_flight)
+            parts = results.pop(block)
+            lines = [line for _, sentences in parts for line in sentences.splitlines(keepends=True)]
+            order = np.argsort(np.concatenate([indices for indices, _ in parts]), kind='stable')
+            output.writelines([lines[i] for i in order])
+            written += len(order)
+        for inbox in inboxes:
+            inbox.put(None)
+    finally:
+        for process in processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+    return written
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Convert an SBS log to AIS type 9 NMEA sentences at full speed, '
+                                     'one per valid state like the live inline pipeline with scheduler and trame_cache off')
+    parser.add_argument('input', help='SBS log, e.g. data/ads_data.log')
+    parser.add_argument('-o', '--output', default='-', help="NMEA output file, '-' for stdout")
+    parser.add_argument('--workers', type=int, default=1, help='processes, aircraft are split between them by ICAO')
+    parser.add_argument('--start-time', type=datetime.fromisoformat, default=None,
+                        help='TimestampAdjuster start time (ISO 8601), fixes the AIS timestamp seconds, defaults to now like the live pipeline')
+    parser.add_argument('--ttl', type=float, default=300.0, help='seconds of feed time before an aircraft is forgotten')
+    parser.add_argument('--max-size', type=int, default=10000)
+    parser.add_argument('--block-size', type=int, default=16 * 1024 * 1024, help='input bytes per block')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    start_time = args.start_time or datetime.now()
+    started = time.perf_counter()
+    if args.output == '-':
+        count = convert(args.input, sys.stdout.buffer, start_time, args.workers, args.block_size, args.ttl, args.max_size)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, 'wb', buffering=1024 * 1024) as output:
+            count = convert(args.input, output, start_time, args.workers, args.block_size, args.ttl, args.max_size)
+    print(f"Wrote {count} sentences in {time.perf_counter() - started:.2f}s", file=sys.stderr)
@@ -1,20 +1,17 @@
 from src.presentation.app import Application
+from src.infrastructure.settings import SettingsReader
+from src.infrastructure.logconfig import configure_logging
 import asyncio
 import logging
 import signal
 import sys
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+settings = SettingsReader().settings
+configure_logging(settings.get('logging'))
 
 logger = logging.getLogger(__name__)
 
-application = Application()
+application = Application(settings)
 
 def handler(num, frame):
     logger.info(f"Received signal {num}, stopping application")
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from src.domain.models import Aircraft
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+Fields = Tuple[int, int, int, int, int]
+
+class TrameCache:
+    def __init__(self, refresh_interval: float = 30.0, max_size: int = 10000, ttl: float = 300.0, sweep_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.refresh_interval = refresh_interval
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        # icao -> (quantized fields, sentence, last sent), least recently sent first
+        self.entries: OrderedDict[str, Tuple[Fields, str, float]] = OrderedDict()
+        self.last_sweep = clock()
+        self.hits = 0
+        self.misses = 0
+        self.suppressed = 0
+        self.refreshed = 0
+        self.expired = 0
+        self.evicted = 0
+        logger.info(f"Initialized TrameCache with refresh_interval: {refresh_interval}, max_size: {max_size}, ttl: {ttl}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def quantize(aircraft: Aircraft) -> Fields:
+        # the values exactly as AisMessageBuilder.pack_type9 writes them into the type 9 fields,
+        # two states share a key only when they encode to the same sentence (timestamp seconds aside)
+        return (
+            int(round(aircraft.latitude * 60 * 10000)) & 0x7FFFFFF,
+            int(round(aircraft.longitude * 60 * 10000)) & 0xFFFFFFF,
+            int(round(aircraft.altitude * 0.3048)) & 0xFFF,
+            int(aircraft.speed) & 0x3FF,
+            int(round(aircraft.heading * 10)) % 4096
+        )
+
+    def lookup(self, icao: str, fields: Fields) -> Tuple[bool, Optional[str]]:
+        # (hit, sentence to resend), a hit without a sentence is suppressed until refresh_interval has passed
+        now = self.clock()
+        if now - self.last_sweep >= self.sweep_interval:
+            self.expire(now)
+        entry = self.entries.get(icao)
+        if entry is None or entry[0] != fields:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        if now - entry[2] < self.refresh_interval:
+            self.suppressed += 1
+            return True, None
+        self.refreshed += 1
+        self.entries[icao] = (fields, entry[1], now)
+        self.entries.move_to_end(icao)
+        return True, entry[1]
+
+    def store(self, icao: str, fields: Fields, sentence: str) -> None:
+        self.entries[icao] = (fields, sentence, self.clock())
+        self.entries.move_to_end(icao)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    def expire(self, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        self.last_sweep = now
+        expired = 0
+        while self.entries:
+            icao, entry = next(iter(self.entries.items()))
+            if now - entry[2] < self.ttl:
+                break
+            del self.entries[icao]
+            expired += 1
+        self.expired += expired
+        return expired
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'suppressed': self.suppressed,
+            'refreshed': self.refreshed,
+            'expired': self.expired,
+            'evicted': self.evicted
+        }
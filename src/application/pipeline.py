@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Sequence
+from src.domain.models import Aircraft
+from src.domain.ports import ISender
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LatestQueue(asyncio.Queue):
+    # bounded queue of aircraft keyed by ICAO, a newer state of a queued ICAO takes its place in line
+    def _init(self, maxsize: int) -> None:
+        self._queue: OrderedDict[str, Aircraft] = OrderedDict()
+
+    def _put(self, aircraft: Aircraft) -> None:
+        self._queue[aircraft.icao] = aircraft
+
+    def _get(self) -> Aircraft:
+        return self._queue.popitem(last=False)[1]
+
+    def __contains__(self, icao: str) -> bool:
+        return icao in self._queue
+
+    def replace(self, aircraft: Aircraft) -> None:
+        # newer state of a queued ICAO, the queue length does not change so there is nothing to wake up
+        self._queue[aircraft.icao] = aircraft
+
+    def shed_oldest(self) -> None:
+        self._queue.popitem(last=False)
+
+class StagedPipeline:
+    def __init__(self, encode: Callable[[Sequence[Aircraft]], Awaitable[None]], sender: ISender, encode_queue_size: int = 10000,
+                 encode_workers: int = 1, encode_batch: int = 64, broadcast_queue_size: int = 10000, broadcast_workers: int = 1,
+                 broadcast_batch: int = 256):
+        self.encode = encode
+        self.sender = sender
+        self.encode_workers = encode_workers
+        self.encode_batch = encode_batch
+        self.broadcast_workers = broadcast_workers
+        self.broadcast_batch = broadcast_batch
+        self.encode_queue = LatestQueue(encode_queue_size)
+        self.broadcast_queue: asyncio.Queue[str] = asyncio.Queue(broadcast_queue_size)
+        self.tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.coalesced = 0
+        self.encode_shed = 0
+        self.broadcast_shed = 0
+        self.broadcasted = 0
+        logger.info(f"Initialized StagedPipeline with encode_workers: {encode_workers}, encode_batch: {encode_batch}, "
+                    f"broadcast_workers: {broadcast_workers}, broadcast_batch: {broadcast_batch}")
+
+    def submit(self, aircraft: Aircraft) -> None:
+        # never waits, so the receiver keeps reading the feed whatever the downstream stages do
+        self.submitted += 1
+        queue = self.encode_queue
+        if aircraft.icao in queue:
+            queue.replace(aircraft)
+            self.coalesced += 1
+            return
+        if queue.full():
+            queue.shed_oldest()
+            self.encode_shed += 1
+        queue.put_nowait(aircraft)
+
+    async def send(self, message: str) -> None:
+        # ISender for the encode stage, feeds the broadcast stage
+        queue = self.broadcast_queue
+        if queue.full():
+            queue.get_nowait()
+            self.broadcast_shed += 1
+        queue.put_nowait(message)
+
+    def start(self) -> None:
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(self.run_encode()) for _ in range(self.encode_workers)]
+            self.tasks += [asyncio.create_task(self.run_broadcast()) for _ in range(self.broadcast_workers)]
+            logger.info(f"Started StagedPipeline")
+
+    def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        logger.info(f"Stopped StagedPipeline, submitted: {self.submitted}, coalesced: {self.coalesced}, "
+                    f"encode_shed: {self.encode_shed}, broadcast_shed: {self.broadcast_shed}, broadcasted: {self.broadcasted}")
+
+    @staticmethod
+    async def take(queue: asyncio.Queue, size: int) -> list:
+        batch = [await queue.get()]
+        while len(batch) < size and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
+
+    async def run_encode(self) -> None:
+        while True:
+            batch = await self.take(self.encode_queue, self.encode_batch)
+            try:
+                await self.encode(batch)
+            except Exception as e:
+                logger.error(f"Error in StagedPipeline encode stage: {e}")
+            # get() does not suspend while the queue has items, let the receiver read in between batches
+            await asyncio.sleep(0)
+
+    async def run_broadcast(self) -> None:
+        while True:
+            batch = await self.take(self.broadcast_queue, self.broadcast_batch)
+            try:
+                for message in batch:
+                    await self.sender.send(message)
+                self.broadcasted += len(batch)
+            except Exception as e:
+                logger.error(f"Error in StagedPipeline broadcast stage: {e}")
+            await asyncio.sleep(0)
@@ -0,0 +1,86 @@
+from dataclasses import replace
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from src.domain.models import Aircraft
+import asyncio
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmissionScheduler:
+    def __init__(self, emit: Callable[[Aircraft], Awaitable[None]], interval: float = 10.0, speed_intervals: Optional[Sequence[Sequence[float]]] = None):
+        self.emit = emit
+        self.interval = interval
+        # (min speed in knots, interval in seconds), highest threshold first
+        self.speed_intervals: List[Tuple[float, float]] = sorted(((float(s), float(i)) for s, i in speed_intervals or []), reverse=True)
+        self.pending: Dict[str, Aircraft] = {}
+        self.due: Dict[str, float] = {}
+        self.heap: List[Tuple[float, str]] = []
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.emitted = 0
+        logger.info(f"Initialized EmissionScheduler with interval: {interval}, speed_intervals: {self.speed_intervals}")
+
+    def interval_for(self, aircraft: Aircraft) -> float:
+        if self.speed_intervals and aircraft.speed is not None:
+            for min_speed, interval in self.speed_intervals:
+                if aircraft.speed >= min_speed:
+                    return interval
+        return self.interval
+
+    def update(self, aircraft: Aircraft) -> None:
+        self.received += 1
+        # the store updates its records in place and a later message may clear a field, keep this valid state until emitted
+        self.pending[aircraft.icao] = replace(aircraft)
+        if aircraft.icao not in self.due:
+            now = asyncio.get_running_loop().time()
+            self.due[aircraft.icao] = now
+            heapq.heappush(self.heap, (now, aircraft.icao))
+            self.wakeup.set()
+
+    def start(self) -> None:
+        if not self.task:
+            self.task = asyncio.create_task(self.run())
+            logger.info(f"Started EmissionScheduler")
+
+    def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+        self.task = None
+        logger.info(f"Stopped EmissionScheduler, received: {self.received}, emitted: {self.emitted}")
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.heap:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            due, icao = self.heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            aircraft = self.pending.pop(icao, None)
+            if aircraft is None:
+                # nothing new since the last emission, reschedule on the next update
+                del self.due[icao]
+                continue
+
+            next_due = max(due, loop.time()) + self.interval_for(aircraft)
+            self.due[icao] = next_due
+            heapq.heappush(self.heap, (next_due, icao))
+
+            try:
+                await self.emit(aircraft)
+                self.emitted += 1
+            except Exception as e:
+                logger.error(f"Error emitting aircraft {icao}: {e}")
@@ -1,19 +1,95 @@
 from src.domain.ports import ISender
 from src.domain.models import Aircraft, AISTrame
 from src.domain.ports import IAISMessageBuilder
+from src.application.cache import TrameCache
+from typing import List, Optional, Protocol, Sequence, Tuple
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+class Observer(Protocol):
+    def observe(self, value: float) -> None: ...
+
+class Sampler(Protocol):
+    def allow(self, key: str) -> bool: ...
+
 class ConvertAircraftToAISTrame:
-    def __init__(self, sender: ISender):
+    def __init__(self, sender: ISender, encode_time: Optional[Observer] = None, log_sampler: Optional[Sampler] = None,
+                 cache: Optional[TrameCache] = None):
         self.sender = sender
+        self.encode_time = encode_time
+        self.log_sampler = log_sampler
+        self.cache = cache
+        self.sent = 0
 
-    async def execute(self, aircraft: Aircraft, builder: IAISMessageBuilder) -> None:
+    def accept(self, aircraft: Aircraft) -> bool:
         if not (-90 <= aircraft.latitude <= 90) and not (-180 <= aircraft.longitude <= 180):
-            logger.error(f"Invalid latitude or longitude: {aircraft.latitude}, {aircraft.longitude}")
+            logger.error("Invalid latitude or longitude: %s, %s", aircraft.latitude, aircraft.longitude)
+            return False
+        return True
+
+    async def execute(self, aircraft: Aircraft, builder: IAISMessageBuilder) -> None:
+        if not self.accept(aircraft):
             return
-        
-        trame: AISTrame = await builder.build_ais_type9_trame(aircraft)
+
+        if self.cache is not None:
+            fields = self.cache.quantize(aircraft)
+            hit, sentence = self.cache.lookup(aircraft.icao, fields)
+            if hit:
+                # unchanged at AIS resolution, resend the cached sentence only once refresh_interval has passed
+                if sentence is not None:
+                    await self.sender.send(sentence)
+                    self.sent += 1
+                return
+
+        if self.encode_time is not None:
+            started = time.perf_counter()
+            trame: AISTrame = await builder.build_ais_type9_trame(aircraft)
+            self.encode_time.observe(time.perf_counter() - started)
+        else:
+            trame = await builder.build_ais_type9_trame(aircraft)
+        if self.cache is not None:
+            self.cache.store(aircraft.icao, fields, trame.nmea_message)
         await self.sender.send(trame.nmea_message)
-        logger.info(f"Sent AIS Type 9 trame: {trame.nmea_message}")
\ No newline at end of file
+        self.sent += 1
+        if logger.isEnabledFor(logging.INFO) and (self.log_sampler is None or self.log_sampler.allow(aircraft.icao)):
+            logger.info("Sent AIS Type 9 trame: %s", trame.nmea_message)
+
+    async def execute_batch(self, aircrafts: Sequence[Aircraft], builder: IAISMessageBuilder) -> None:
+        # same as execute per aircraft, the states that need encoding go through one batch encode
+        pending: List[Tuple[Aircraft, Optional[tuple]]] = []
+        for aircraft in aircrafts:
+            # queued states are store records updated in place, a later message may have cleared a field
+            if not aircraft.valid() or not self.accept(aircraft):
+                continue
+            fields = None
+            if self.cache is not None:
+                fields = self.cache.quantize(aircraft)
+                hit, sentence = self.cache.lookup(aircraft.icao, fields)
+                if hit:
+                    if sentence is not None:
+                        await self.sender.send(sentence)
+                        self.sent += 1
+                    continue
+            pending.append((aircraft, fields))
+        if not pending:
+            return
+
+        started = time.perf_counter()
+        if len(pending) == 1:
+            trames = [await builder.build_ais_type9_trame(pending[0][0])]
+        else:
+            trames = builder.build_ais_type9_batch([aircraft for aircraft, _ in pending])
+        if self.encode_time is not None:
+            elapsed = (time.perf_counter() - started) / len(trames)
+            for _ in trames:
+                self.encode_time.observe(elapsed)
+
+        for (aircraft, fields), trame in zip(pending, trames):
+            if self.cache is not None:
+                self.cache.store(aircraft.icao, fields, trame.nmea_message)
+            await self.sender.send(trame.nmea_message)
+            self.sent += 1
+            if logger.isEnabledFor(logging.INFO) and (self.log_sampler is None or self.log_sampler.allow(aircraft.icao)):
+                logger.info("Sent AIS Type 9 trame: %s", trame.nmea_message)
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, List, Sequence
 from src.domain.models import Aircraft, AISTrame
 
 class IReceiver(ABC):
@@ -31,4 +31,8 @@ class ISender(ABC):
 class IAISMessageBuilder(ABC):
     @abstractmethod
     def build_ais_type9_trame(self, aircraft: Aircraft) -> AISTrame:
+        pass
+
+    @abstractmethod
+    def build_ais_type9_batch(self, aircrafts: Sequence[Aircraft]) -> List[AISTrame]:
         pass
\ No newline at end of file
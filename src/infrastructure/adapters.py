@@ -1,24 +1,83 @@
-from datetime import timezone
-from typing import Dict, Optional, Callable, Awaitable, Set, Tuple
+from datetime import datetime, timezone
+from collections import deque, OrderedDict
+from functools import reduce
+from operator import xor
+from typing import Dict, Optional, Callable, Awaitable, Tuple, List, Sequence, Deque, Set
 from src.domain.ports import IReceiver, ISender, IAISMessageBuilder
 from src.domain.models import Aircraft, AISTrame
 from src.infrastructure.utils import TimestampAdjuster
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.sbs import SBSParser
+from src.infrastructure.metrics import MetricsRegistry, Metric, Histogram, Gauge
+from src.infrastructure.logconfig import LogSampler
+from src.infrastructure.subscriptions import Subscription, SubscriptionIndex
+import numpy as np
 import asyncio
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+SIXBIT_TABLE = [chr(i + 48) if i < 40 else chr(i + 56) for i in range(64)]
+SIXBIT_ASCII = np.array([ord(c) for c in SIXBIT_TABLE], dtype=np.uint8)
+SIXBIT_WEIGHTS = np.array([32, 16, 8, 4, 2, 1], dtype=np.uint8)
+TYPE9_SHIFTS = tuple(range(162, -1, -6))
+TYPE9_PREFIX = 'AIVDM,1,1,,A,'
+TYPE9_BODY_CHECKSUM = reduce(xor, f'{TYPE9_PREFIX},0'.encode('ascii'), 0)
+
+def decode_mmsi(message: str) -> Optional[int]:
+    try:
+        payload = message.split(',', 6)[5]
+        value = 0
+        for ch in payload[:7]:
+            sextet = ord(ch) - 48
+            value = (value << 6) | (sextet - 8 if sextet > 40 else sextet)
+        return (value >> 4) & 0x3FFFFFFF
+    except Exception:
+        return None
+
+def decode_position(message: str) -> Tuple[Optional[int], Optional[float], Optional[float]]:
+    # mmsi, latitude, longitude of a type 9 sentence, from the first 120 payload bits
+    try:
+        payload = message.split(',', 6)[5]
+        value = 0
+        for ch in payload[:20]:
+            sextet = ord(ch) - 48
+            value = (value << 6) | (sextet - 8 if sextet > 40 else sextet)
+        value <<= 6 * (20 - len(payload[:20]))
+        mmsi = (value >> 82) & 0x3FFFFFFF
+        lon = (value >> 31) & 0xFFFFFFF
+        lat = (value >> 4) & 0x7FFFFFF
+        lon = (lon - (1 << 28) if lon & (1 << 27) else lon) / 600000
+        lat = (lat - (1 << 27) if lat & (1 << 26) else lat) / 600000
+        if len(payload) < 20 or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return mmsi, None, None
+        return mmsi, lat, lon
+    except Exception:
+        return None, None, None
+
 class TCPADSReceiver(IReceiver):
-    def __init__(self, host: str, port: int, adjuster: TimestampAdjuster, reconnect_delay: float = 5.0):
+    def __init__(self, host: str, port: int, adjuster: TimestampAdjuster, reconnect_delay: float = 5.0, store: Optional[AircraftStore] = None, chunk_size: int = 65536,
+                 name: Optional[str] = None, log_sampler: Optional[LogSampler] = None):
         self.host = host
         self.port = port
+        self.name = name or f"{host}:{port}"
         self.adjuster = adjuster
         self.reconnect_delay = reconnect_delay
-        self.aircrafts: Dict[str, Aircraft] = {}
+        self.chunk_size = chunk_size
+        self.aircrafts: AircraftStore = store if store is not None else AircraftStore()
+        self.parser = SBSParser(self.aircrafts, adjuster)
         self.task: Optional[asyncio.Task] = None
         self.stopping = asyncio.Event()
         self.callback: Callable[[Aircraft], Awaitable[None]] | None = None
-        logger.info(f"Initialized TCPADSReceiver with host: {host}, port: {port}, reconnect_delay: {reconnect_delay}")
+        self.connected = False
+        self.accepted = 0
+        self.invalid = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.started_at = time.monotonic()
+        self.log_sampler = log_sampler if log_sampler is not None else LogSampler()
+        logger.info(f"Initialized TCPADSReceiver {self.name} with host: {host}, port: {port}, reconnect_delay: {reconnect_delay}")
     
     def register_callback(self, callback: Callable[[Aircraft], Awaitable[None]]) -> None:
         self.callback = callback
@@ -35,7 +94,7 @@ class TCPADSReceiver(IReceiver):
         if self.task:
             self.task.cancel()
         self.task = None
-        logger.info(f"Stopped TCPADSReceiver")
+        logger.info(f"Stopped TCPADSReceiver, aircraft store: {self.aircrafts.stats()}")
     
     async def run(self) -> None:
         while not self.stopping.is_set():
@@ -43,21 +102,38 @@ class TCPADSReceiver(IReceiver):
                 logger.info(f"Connecting to {self.host}:{self.port}")
                 reader, writer = await asyncio.open_connection(self.host, self.port)
                 try:
+                    self.parser.reset()
+                    self.connected = True
+                    first: Optional[Tuple[float, datetime]] = None
                     while not self.stopping.is_set() and self.callback:
-                        line = await reader.readline()
-                        if not line:
+                        chunk = await reader.read(self.chunk_size)
+                        if not chunk:
                             break
-                        text = line.decode('utf-8', errors='ignore').strip()
-                        if not text:
-                            continue
 
-                        aircraft = self.parse_aircraft(text)
-                        self.aircrafts[aircraft.icao] = aircraft
+                        aircraft = None
+                        for line in self.parser.split(chunk):
+                            aircraft = self.parser.parse_line(line.strip())
+                            if aircraft is None:
+                                continue
+                            self.accepted += 1
 
-                        if aircraft.valid():
-                            logger.info(f"Sending aircraft {aircraft.icao} to callback")
-                            await self.callback(aircraft)
+                            if aircraft.valid():
+                                if logger.isEnabledFor(logging.INFO) and self.log_sampler.allow(aircraft.icao):
+                                    logger.info("Sending aircraft %s to callback", aircraft.icao)
+                                await self.callback(aircraft)
+                            else:
+                                self.invalid += 1
+
+                        if aircraft is not None:
+                            # wall clock elapsed on this connection minus feed time elapsed
+                            if first is None:
+                                first = (time.monotonic(), aircraft.timestamp)
+                            self.lag = (time.monotonic() - first[0]) - (aircraft.timestamp - first[1]).total_seconds()
+                            self.max_lag = max(self.max_lag, self.lag)
+                        # read() returns buffered data without suspending, give the other stages a turn per chunk
+                        await asyncio.sleep(0)
                 finally:
+                    self.connected = False
                     try:
                         writer.close()
                         await writer.wait_closed()
@@ -69,128 +145,168 @@ class TCPADSReceiver(IReceiver):
                 continue
     
     def parse_aircraft(self, text: str) -> Optional[Aircraft]:
-        try:
-            logger.info(f"Parsing aircraft: {text}")    
-
-            parts = text.strip().split(',')
-
-            if len(parts) < 22 or not parts[0].startswith('MSG'):
-                return None
-            
-            msg_type = int(parts[1])
-            icao = parts[4].strip()
-            timestamp = self.adjuster.adjust(f"{parts[6]} {parts[7]}")
-            callsign = parts[10].strip() or None
-            altitude = int(parts[11]) if parts[11] else None
-            speed = float(parts[12]) if parts[12] else None
-            heading = float(parts[13]) if parts[13] else None
-            latitude = float(parts[14]) if parts[14] else None
-            longitude = float(parts[15]) if parts[15] else None
-
-            aircraft = self.aircrafts.get(icao, Aircraft(icao=icao))
-
-            logger.info(f'Decoding message type {msg_type}...')
-            
-            if msg_type == 1:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=callsign if callsign else aircraft.callsign,
-                    altitude=aircraft.altitude,
-                    latitude=aircraft.latitude,
-                    longitude=aircraft.longitude,
-                    heading=aircraft.heading,
-                    speed=aircraft.speed,
-                    timestamp=timestamp
-                )                
-            elif msg_type == 2:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=aircraft.callsign,
-                    altitude=aircraft.altitude,
-                    latitude=latitude,
-                    longitude=longitude,
-                    heading=heading,
-                    speed=speed,
-                    timestamp=timestamp
-                )
-            elif msg_type == 3:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=aircraft.callsign,
-                    altitude=altitude,
-                    latitude=latitude,
-                    longitude=longitude,
-                    heading=aircraft.heading,
-                    speed=aircraft.speed,
-                    timestamp=timestamp
-                )
-            elif msg_type == 4:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=aircraft.callsign,
-                    altitude=aircraft.altitude,
-                    latitude=aircraft.latitude,
-                    longitude=aircraft.longitude,
-                    heading=heading,
-                    speed=speed,
-                    timestamp=timestamp
-                )
-            elif msg_type == 5:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=callsign if callsign else aircraft.callsign,
-                    altitude=altitude,
-                    latitude=aircraft.latitude,
-                    longitude=aircraft.longitude,
-                    heading=aircraft.heading,
-                    speed=aircraft.speed,
-                    timestamp=timestamp
-                )
-            elif msg_type == 6:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=callsign if callsign else aircraft.callsign,
-                    altitude=aircraft.altitude,
-                    latitude=aircraft.latitude,
-                    longitude=aircraft.longitude,
-                    heading=aircraft.heading,
-                    speed=aircraft.speed,
-                    timestamp=timestamp
-                )
-            elif msg_type == 7:
-                return Aircraft(
-                    icao=aircraft.icao,
-                    callsign=aircraft.callsign,
-                    altitude=altitude,
-                    latitude=aircraft.latitude,
-                    longitude=aircraft.longitude,
-                    heading=aircraft.heading,
-                    speed=aircraft.speed,
-                    timestamp=timestamp
-                )
-            elif msg_type == 8:
-                return Aircraft(
-                    icao=icao,
-                    callsign=aircraft.callsign,
-                    altitude=aircraft.altitude,
-                    latitude=aircraft.latitude,
-                    longitude=aircraft.longitude,
-                    heading=aircraft.heading,
-                    speed=aircraft.speed,
-                    timestamp=timestamp
-                )
-        except Exception as e:
-            logger.error(f"Error parsing aircraft: {e}")
-            return None
+        return self.parser.parse_aircraft(text)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            'name': self.name,
+            'connected': self.connected,
+            'lines': self.parser.lines,
+            'accepted': self.accepted,
+            'invalid': self.invalid,
+            'duplicates': self.parser.duplicates,
+            'failures': self.parser.failures,
+            'lines_per_sec': self.parser.lines / elapsed if elapsed > 0 else 0.0,
+            'lag': self.lag,
+            'max_lag': self.max_lag
+        }
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        labels = {'feed': self.name}
+        registry.counter_func('ads_receiver_lines_total', 'SBS lines received', lambda: self.parser.lines, labels)
+        registry.counter_func('ads_receiver_parse_failures_total', 'SBS lines that failed to parse', lambda: self.parser.failures, labels)
+        registry.counter_func('ads_receiver_duplicates_total', 'SBS updates dropped as duplicate or out of order', lambda: self.parser.duplicates, labels)
+        registry.counter_func('ads_receiver_invalid_aircraft_total', 'Parsed updates whose aircraft state is not yet valid', lambda: self.invalid, labels)
+        registry.gauge('ads_receiver_connected', 'Whether the feed connection is up', labels, lambda: int(self.connected))
+        registry.gauge('ads_receiver_lag_seconds', 'Wall clock minus feed time elapsed on the current connection', labels, lambda: self.lag)
+
+class MultiFeedReceiver(IReceiver):
+    def __init__(self, feeds: Sequence[dict], adjuster: TimestampAdjuster, store: AircraftStore, reconnect_delay: float = 5.0,
+                 log_sampler: Optional[LogSampler] = None):
+        self.aircrafts = store
+        # one sampler for all feeds, an aircraft seen by several stations is logged once per interval
+        self.log_sampler = log_sampler if log_sampler is not None else LogSampler()
+        self.receivers = [
+            TCPADSReceiver(
+                feed['host'],
+                feed['port'],
+                adjuster=adjuster,
+                reconnect_delay=feed.get('reconnect_delay', reconnect_delay),
+                store=store,
+                name=feed.get('name'),
+                log_sampler=self.log_sampler
+            )
+            for feed in feeds
+        ]
+        logger.info(f"Initialized MultiFeedReceiver with feeds: {[r.name for r in self.receivers]}")
+
+    def register_callback(self, callback: Callable[[Aircraft], Awaitable[None]]) -> None:
+        for receiver in self.receivers:
+            receiver.register_callback(callback)
+
+    def start(self) -> None:
+        for receiver in self.receivers:
+            receiver.start()
+
+    def stop(self) -> None:
+        for receiver in self.receivers:
+            receiver.stop()
+
+    def stats(self) -> list:
+        return [receiver.stats() for receiver in self.receivers]
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        for receiver in self.receivers:
+            receiver.register_metrics(registry)
     
+class ClientQueue:
+    POLICIES = ('drop_oldest', 'drop_newest', 'disconnect', 'latest_per_mmsi')
+
+    def __init__(self, writer: asyncio.StreamWriter, maxsize: int = 1024, policy: str = 'drop_oldest'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy}, expected one of {self.POLICIES}")
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.maxsize = maxsize
+        self.policy = policy
+        self.messages: Deque[bytes] = deque()
+        self.latest: OrderedDict[Optional[int], bytes] = OrderedDict()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.overflowed = False
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+        self.writes = 0
+        self.write_time: Optional[Histogram] = None
+        self.drain_time: Optional[Histogram] = None
+        self.metrics: List[Tuple[str, str, str, Metric]] = []
+
+    def __len__(self) -> int:
+        return len(self.latest) if self.policy == 'latest_per_mmsi' else len(self.messages)
+
+    def put(self, data: bytes, mmsi: Optional[int] = None) -> bool:
+        if self.policy == 'latest_per_mmsi':
+            if mmsi in self.latest:
+                self.latest[mmsi] = data
+                self.dropped += 1
+            else:
+                if len(self.latest) >= self.maxsize:
+                    self.latest.popitem(last=False)
+                    self.dropped += 1
+                self.latest[mmsi] = data
+        elif len(self.messages) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == 'drop_newest':
+                return True
+            if self.policy == 'disconnect':
+                self.overflowed = True
+                return False
+            self.messages.popleft()
+            self.messages.append(data)
+        else:
+            self.messages.append(data)
+        self.ready.set()
+        return True
+
+    async def get(self) -> bytes:
+        while not len(self):
+            self.ready.clear()
+            await self.ready.wait()
+        if self.policy == 'latest_per_mmsi':
+            return self.latest.popitem(last=False)[1]
+        return self.messages.popleft()
+
+    def take(self, batch: List[bytes], size: int, max_bytes: int) -> int:
+        # moves queued sentences into batch until max_bytes, returns the new batch size in bytes
+        queue = self.latest if self.policy == 'latest_per_mmsi' else self.messages
+        while queue and size < max_bytes:
+            data = queue.popitem(last=False)[1] if self.policy == 'latest_per_mmsi' else queue.popleft()
+            batch.append(data)
+            size += len(data)
+        return size
+
+    async def get_batch(self, window: float, max_bytes: int) -> List[bytes]:
+        batch = [await self.get()]
+        size = self.take(batch, len(batch[0]), max_bytes)
+        if size < max_bytes:
+            # one wakeup per window instead of one per sentence, window is the most batching adds to latency
+            await asyncio.sleep(window)
+            self.take(batch, size, max_bytes)
+        return batch
+
+    def stats(self) -> dict:
+        return {'peer': self.peer, 'queued': len(self), 'sent': self.sent, 'dropped': self.dropped, 'writes': self.writes}
+
 class TCPAISMessageSender(ISender):
-    def __init__(self, host: str = '127.0.0.1', port: int = 4002):
+    def __init__(self, host: str = '127.0.0.1', port: int = 4002, queue_size: int = 1024, overflow_policy: str = 'drop_oldest',
+                 batch_window: float = 0.0, batch_bytes: int = 65536, cell_size: float = 1.0):
+        if overflow_policy not in ClientQueue.POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy}, expected one of {ClientQueue.POLICIES}")
         self.host = host
         self.port = port
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.batch_window = batch_window
+        self.batch_bytes = batch_bytes
+        self.subscriptions = SubscriptionIndex(cell_size)
+        self.routed = 0
         self.server: asyncio.base_events.Server | None = None
-        self.clients: Set[asyncio.StreamWriter] = set()
-        self.lock = asyncio.Lock()
-        logger.info(f"Initialized TCPAISMessageSender with host: {host}, port: {port}")
+        self.clients: Dict[asyncio.StreamWriter, ClientQueue] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.metrics: Optional[MetricsRegistry] = None
+        logger.info(f"Initialized TCPAISMessageSender with host: {host}, port: {port}, queue_size: {queue_size}, overflow_policy: {overflow_policy}, batch_window: {batch_window}")
     
     async def start(self) -> None:
         self.server = await asyncio.start_server(self.connect_client, self.host, self.port, backlog=100)
@@ -204,51 +320,186 @@ class TCPAISMessageSender(ISender):
             self.server.close()
             await self.server.wait_closed()
         
-        async with self.lock:
-            for w in list(self.clients):
-                try:
-                    w.close()
-                    await w.wait_closed()
-                except Exception as e:
-                    logger.error(f"Error closing client: {e}")
-            self.clients.clear()
-            logger.info(f"Stopped TCPAISMessageSender")
+        for client in list(self.clients.values()):
+            await self.disconnect(client)
+        self.clients.clear()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        logger.info(f"Stopped TCPAISMessageSender")
     
     async def send(self, message: str) -> None:
+        if not self.clients:
+            return
         data = f'{message}\n'.encode('utf-8')
-        async with self.lock:
-            for w in list(self.clients):
-                try:
-                    w.write(data)
-                    await w.drain()
-                except Exception as e:
-                    logger.error(f"Error sending message to client: {e}")
-                    try:
-                        w.close()
-                        await w.wait_closed()
-                    except Exception as e:
-                        logger.error(f"Error closing client: {e}")
-                    self.clients.discard(w)
+        if self.subscriptions.filtered:
+            # some clients only want an area or a list of MMSIs, route through the grid index
+            mmsi, lat, lon = decode_position(message)
+            targets = self.subscriptions.route(mmsi, lat, lon)
+            self.routed += 1
+        else:
+            mmsi = decode_mmsi(message) if self.overflow_policy == 'latest_per_mmsi' else None
+            targets = list(self.clients.values())
+        for client in targets:
+            if not client.put(data, mmsi):
+                self.clients.pop(client.writer, None)
+                self.subscriptions.unsubscribe(client)
+                logger.warning(f"Client {client.peer} queue overflowed ({client.maxsize} messages), disconnecting")
+                # keep a reference until done, the loop only holds weak references to tasks
+                task = asyncio.create_task(self.disconnect(client))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    def stats(self) -> list:
+        return [client.stats() for client in self.clients.values()]
+
+    def memory_usage(self) -> int:
+        # sentences queued per client plus what the transports still hold
+        size = 0
+        for client in list(self.clients.values()):
+            size += sum(map(len, client.messages)) + sum(map(len, client.latest.values()))
+            transport = client.writer.transport
+            if transport is not None:
+                size += transport.get_write_buffer_size()
+        return size
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        self.metrics = registry
+        registry.gauge('ais_sender_clients', 'Connected NMEA clients', func=lambda: len(self.clients))
+        registry.gauge('ais_sender_queue_depth', 'Sentences queued across all NMEA clients', func=lambda: sum(len(c) for c in self.clients.values()))
+        registry.gauge('ais_sender_filtered_clients', 'NMEA clients with an area or MMSI subscription', func=lambda: len(self.subscriptions) - len(self.subscriptions.everyone))
+        registry.counter_func('ais_sender_routed_total', 'Sentences routed through the subscription index', lambda: self.routed)
+
+    def register_client_metrics(self, client: ClientQueue) -> None:
+        labels = {'client': f'{client.peer[0]}:{client.peer[1]}' if client.peer else 'unknown'}
+        client.write_time = Histogram(labels=labels)
+        client.drain_time = Histogram(labels=labels)
+        client.metrics = [
+            ('ais_sender_write_seconds', 'histogram', 'Time spent in write() per write', client.write_time),
+            ('ais_sender_drain_seconds', 'histogram', 'Time spent awaiting drain() per write', client.drain_time),
+            ('ais_sender_bytes_total', 'counter', 'Bytes written to the client', Gauge(labels, lambda: client.bytes_sent)),
+            ('ais_sender_writes_total', 'counter', 'Writes to the client, one per sentence or per batch', Gauge(labels, lambda: client.writes)),
+            ('ais_sender_dropped_total', 'counter', 'Sentences dropped by the overflow policy', Gauge(labels, lambda: client.dropped))
+        ]
+        for name, kind, help, metric in client.metrics:
+            self.metrics.register(name, kind, help, metric)
+
+    def unregister_client_metrics(self, client: ClientQueue) -> None:
+        for name, _, _, metric in client.metrics:
+            self.metrics.unregister(name, metric)
+
+    async def write_client(self, client: ClientQueue) -> None:
+        if self.batch_window > 0:
+            return await self.write_client_batched(client)
+        try:
+            while True:
+                data = await client.get()
+                if client.write_time is not None:
+                    started = time.perf_counter()
+                    client.writer.write(data)
+                    written = time.perf_counter()
+                    await client.writer.drain()
+                    client.write_time.observe(written - started)
+                    client.drain_time.observe(time.perf_counter() - written)
+                else:
+                    client.writer.write(data)
+                    await client.writer.drain()
+                client.sent += 1
+                client.writes += 1
+                client.bytes_sent += len(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to client {client.peer}: {e}")
+            client.writer.close()
+
+    async def write_client_batched(self, client: ClientQueue) -> None:
+        try:
+            while True:
+                batch = await client.get_batch(self.batch_window, self.batch_bytes)
+                if client.write_time is not None:
+                    started = time.perf_counter()
+                    client.writer.writelines(batch)
+                    written = time.perf_counter()
+                    await client.writer.drain()
+                    client.write_time.observe(written - started)
+                    client.drain_time.observe(time.perf_counter() - written)
+                else:
+                    client.writer.writelines(batch)
+                    await client.writer.drain()
+                client.sent += len(batch)
+                client.writes += 1
+                client.bytes_sent += sum(map(len, batch))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to client {client.peer}: {e}")
+            client.writer.close()
+
+    async def disconnect(self, client: ClientQueue) -> None:
+        self.clients.pop(client.writer, None)
+        self.subscriptions.unsubscribe(client)
+        if self.metrics is not None and client.metrics:
+            self.unregister_client_metrics(client)
+            client.metrics = []
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+        try:
+            client.writer.close()
+            await client.writer.wait_closed()
+        except Exception as e:
+            logger.error(f"Error closing client: {e}")
     
     async def connect_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-        self.clients.add(writer)
+        client = ClientQueue(writer, self.queue_size, self.overflow_policy)
+        if self.metrics is not None:
+            self.register_client_metrics(client)
+        client.task = asyncio.create_task(self.write_client(client))
+        self.clients[writer] = client
+        self.subscriptions.subscribe(client, Subscription())
         try:
             while True:
                 line = await reader.readline()
                 if not line:
                     break
+                if not line.strip():
+                    continue
+                try:
+                    subscription = Subscription.parse(line.decode('ascii', errors='replace'))
+                except ValueError as e:
+                    logger.warning(f"Client {client.peer} sent {e}")
+                    continue
+                if client.writer in self.clients:
+                    self.subscriptions.subscribe(client, subscription)
+                    logger.info(f"Client {client.peer} subscribed to {subscription}")
+        except Exception as e:
+            logger.error(f"Error reading from client {client.peer}: {e}")
         finally:
-            self.clients.discard(writer)
-            logger.info(f"Disconnected client: {writer.get_extra_info('peername')}")
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except Exception as e:
-                logger.error(f"Error closing writer: {e}")
+            logger.info(f"Disconnected client: {client.peer}, sent: {client.sent}, dropped: {client.dropped}")
+            await self.disconnect(client)
+
+class MultiSender(ISender):
+    def __init__(self, senders: Sequence[ISender]):
+        self.senders = list(senders)
+        logger.info(f"Initialized MultiSender with {[type(s).__name__ for s in self.senders]}")
+
+    async def start(self) -> None:
+        await asyncio.gather(*(sender.start() for sender in self.senders))
+
+    async def stop(self) -> None:
+        for sender in self.senders:
+            await sender.stop()
+
+    async def send(self, message: str) -> None:
+        for sender in self.senders:
+            await sender.send(message)
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        for sender in self.senders:
+            if hasattr(sender, 'register_metrics'):
+                sender.register_metrics(registry)
 
 class AisMessageBuilder(IAISMessageBuilder):
     def __init__(self):
-        self.lock = asyncio.Lock()
         logger.info(f"Initialized AisMessageBuilder")
     
     def to_bits(self, value: int, length: int, signed: bool = False) -> str:
@@ -263,49 +514,72 @@ class AisMessageBuilder(IAISMessageBuilder):
         return int(round(lat * 60 * 10000))
 
     def sixbit_encode(self, bitstring: str) -> Tuple[str, int]:
-        table = [chr(i + 48) if i < 40 else chr(i + 56) for i in range(64)]
         pad = (6 - (len(bitstring) % 6)) % 6
         bitstring_padded = bitstring + '0' * pad
-        payload = ''
-        for i in range(0, len(bitstring_padded), 6):
-            sextet = bitstring_padded[i:i+6]
-            payload += table[int(sextet, 2)]
+        payload = ''.join(SIXBIT_TABLE[int(bitstring_padded[i:i+6], 2)] for i in range(0, len(bitstring_padded), 6))
         return payload, pad
 
     def nmea_checksum(self, body: str) -> str:
-        cs = 0
-        for ch in body:
-            cs ^= ord(ch)
-        return format(cs, '02X')
+        return format(reduce(xor, body.encode('ascii'), 0), '02X')
+
+    def pack_type9(self, aircraft: Aircraft) -> int:
+        value = 9 << 162                                                                # message type, repeat = 0
+        value |= (int(aircraft.icao[:6], 16) & 0x3FFFFFFF) << 130                       # mmsi
+        value |= (int(round(aircraft.altitude * 0.3048)) & 0xFFF) << 118                # altitude
+        value |= (int(aircraft.speed) & 0x3FF) << 108                                   # sog
+        value |= 1 << 107                                                               # position accuracy
+        value |= (self.deg_to_ais_lon(aircraft.longitude) & 0xFFFFFFF) << 79            # longitude
+        value |= (self.deg_to_ais_lat(aircraft.latitude) & 0x7FFFFFF) << 52             # latitude
+        value |= (int(round(aircraft.heading * 10)) % 4096) << 40                       # cog
+        value |= (aircraft.timestamp.astimezone(timezone.utc).second & 0x3F) << 34      # timestamp utc
+        return value                                                                    # regional, dte, spare, assigned, raim, radio status = 0
+
+    def encode_type9(self, aircraft: Aircraft) -> str:
+        value = self.pack_type9(aircraft)
+        payload = ''.join([SIXBIT_TABLE[(value >> shift) & 0x3F] for shift in TYPE9_SHIFTS])
+        checksum = reduce(xor, payload.encode('ascii'), TYPE9_BODY_CHECKSUM)
+        return f'!{TYPE9_PREFIX}{payload},0*{checksum:02X}'
 
     async def build_ais_type9_trame(self, aircraft: Aircraft) -> AISTrame:
-        async with self.lock:
-            nmea_message = f"!AIVDM,1,1,,B,1234567890,0*5A"
-
-            bits = ''
-            bits += self.to_bits(9, 6)                                                      # message type
-            bits += self.to_bits(0,2)                                                       # repeat
-            bits += self.to_bits(int(aircraft.icao[:6], 16), 30)                            # mmsi
-            bits += self.to_bits(int(round(aircraft.altitude * 0.3048)), 12)                # altitude
-            bits += self.to_bits(int(aircraft.speed), 10)                                   # sog
-            bits += self.to_bits(1, 1)                                                      # position accuracy
-            bits += self.to_bits(self.deg_to_ais_lon(aircraft.longitude), 28, signed=True)  # longitude
-            bits += self.to_bits(self.deg_to_ais_lat(aircraft.latitude), 27, signed=True)   # latitude
-            bits += self.to_bits(int(round(aircraft.heading * 10)) % 4096, 12)              # cog
-            bits += self.to_bits(aircraft.timestamp.astimezone(timezone.utc).second, 6)     # timestamp utc
-            bits += self.to_bits(0, 8)                                                      # regional
-            bits += self.to_bits(0, 1)                                                      # dte
-            bits += self.to_bits(0, 3)                                                      # spare 
-            bits += self.to_bits(0, 1)                                                      # assigned
-            bits += self.to_bits(0, 1)                                                      # raim
-            bits += self.to_bits(0, 20)                                                     # radio status
-
-            if len(bits) != 168:
-                bits = bits[:168].ljust(168, '0')
-
-            payload, pad = self.sixbit_encode(bits)
-            body = f'AIVDM,1,1,,A,{payload},{pad}'
-            checksum = self.nmea_checksum(body)
-            nmea_message = f'!{body}*{checksum}'
-
-            return AISTrame(nmea_message=nmea_message)
+        return AISTrame(nmea_message=self.encode_type9(aircraft))
+
+    def build_ais_type9_batch(self, aircrafts: Sequence[Aircraft]) -> List[AISTrame]:
+        count = len(aircrafts)
+        if count == 0:
+            return []
+
+        mmsi = np.fromiter((int(a.icao[:6], 16) for a in aircrafts), dtype=np.int64, count=count)
+        altitude = np.fromiter((a.altitude for a in aircrafts), dtype=np.float64, count=count)
+        speed = np.fromiter((a.speed for a in aircrafts), dtype=np.float64, count=count)
+        longitude = np.fromiter((a.longitude for a in aircrafts), dtype=np.float64, count=count)
+        latitude = np.fromiter((a.latitude for a in aircrafts), dtype=np.float64, count=count)
+        heading = np.fromiter((a.heading for a in aircrafts), dtype=np.float64, count=count)
+        second = np.fromiter((a.timestamp.astimezone(timezone.utc).second for a in aircrafts), dtype=np.int64, count=count)
+
+        # same operation order as the scalar path so rounding is identical
+        fields = (
+            (np.full(count, 9, dtype=np.int64), 0, 6),                                  # message type
+            (mmsi & 0x3FFFFFFF, 8, 30),                                                 # mmsi
+            (np.rint(altitude * 0.3048).astype(np.int64) & 0xFFF, 38, 12),              # altitude
+            (np.trunc(speed).astype(np.int64) & 0x3FF, 50, 10),                         # sog
+            (np.ones(count, dtype=np.int64), 60, 1),                                    # position accuracy
+            (np.rint(longitude * 60 * 10000).astype(np.int64) & 0xFFFFFFF, 61, 28),     # longitude
+            (np.rint(latitude * 60 * 10000).astype(np.int64) & 0x7FFFFFF, 89, 27),      # latitude
+            (np.rint(heading * 10).astype(np.int64) % 4096, 116, 12),                   # cog
+            (second & 0x3F, 128, 6),                                                    # timestamp utc
+        )
+
+        bits = np.zeros((count, 168), dtype=np.uint8)
+        for values, offset, length in fields:
+            shifts = np.arange(length - 1, -1, -1, dtype=np.int64)
+            bits[:, offset:offset + length] = (values[:, None] >> shifts) & 1
+
+        sextets = bits.reshape(count, 28, 6) @ SIXBIT_WEIGHTS
+        chars = SIXBIT_ASCII[sextets]
+        checksums = np.bitwise_xor.reduce(chars, axis=1) ^ TYPE9_BODY_CHECKSUM
+
+        payloads = chars.tobytes().decode('ascii')
+        return [
+            AISTrame(nmea_message=f'!{TYPE9_PREFIX}{payloads[i * 28:(i + 1) * 28]},0*{checksum:02X}')
+            for i, checksum in enumerate(checksums.tolist())
+        ]
@@ -0,0 +1,87 @@
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# handler(query) -> (status, content type, body)
+Handler = Callable[[Dict[str, str]], Tuple[int, str, bytes]]
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+class HTTPEndpoint:
+    def __init__(self, host: str = '127.0.0.1', port: int = 9108, routes: Optional[Dict[str, Handler]] = None):
+        self.host = host
+        self.port = port
+        self.routes: Dict[str, Handler] = dict(routes or {})
+        self.server: asyncio.base_events.Server | None = None
+        logger.info(f"Initialized HTTPEndpoint with host: {host}, port: {port}, routes: {list(self.routes)}")
+
+    def route(self, path: str, handler: Handler) -> None:
+        self.routes[path] = handler
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        logger.info(f"Started HTTPEndpoint on {self.host}:{self.port}")
+
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        logger.info(f"Stopped HTTPEndpoint")
+
+    def dispatch(self, method: str, target: str) -> Tuple[int, str, bytes]:
+        if method not in ('GET', 'HEAD'):
+            return 405, 'text/plain', b'method not allowed\n'
+        url = urlsplit(target)
+        handler = self.routes.get(url.path)
+        if handler is None:
+            return 404, 'text/plain', b'not found\n'
+        try:
+            return handler(dict(parse_qsl(url.query)))
+        except ValueError as e:
+            return 400, 'text/plain', f'{e}\n'.encode('utf-8')
+        except Exception as e:
+            logger.error(f"Error handling {target}: {e}")
+            return 500, 'text/plain', b'internal error\n'
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                keep_alive = request.rstrip().endswith(b'HTTP/1.1')
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    if header.lower().startswith(b'connection:'):
+                        keep_alive = b'keep-alive' in header.lower()
+
+                parts = request.decode('latin-1').split()
+                if len(parts) < 2:
+                    status, content_type, body = 400, 'text/plain', b'bad request\n'
+                else:
+                    status, content_type, body = self.dispatch(parts[0], parts[1])
+
+                head = (
+                    f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+                    f'Content-Type: {content_type}\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+                ).encode('latin-1')
+                writer.writelines((head, body if parts and parts[0] != 'HEAD' else b''))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        except Exception as e:
+            logger.error(f"Error in HTTPEndpoint: {e}")
+        finally:
+            writer.close()
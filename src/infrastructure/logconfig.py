@@ -0,0 +1,69 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Hashable, Optional, TextIO
+import atexit
+import logging
+import queue
+import sys
+import time
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+MODES = ('debug', 'production')
+
+listener: Optional[QueueListener] = None
+
+class LogSampler:
+    # per-key rate limit for log lines emitted once per message on the hot path,
+    # interval 0 lets every line through (debug mode)
+    def __init__(self, interval: float = 0.0, max_keys: int = 10000):
+        self.interval = interval
+        self.max_keys = max_keys
+        self.last: Dict[Hashable, float] = {}
+        self.suppressed = 0
+
+    def allow(self, key: Hashable) -> bool:
+        if self.interval <= 0:
+            return True
+        now = time.monotonic()
+        if now - self.last.get(key, -self.interval) < self.interval:
+            self.suppressed += 1
+            return False
+        if len(self.last) >= self.max_keys:
+            self.last.clear()
+        self.last[key] = now
+        return True
+
+def stop_logging() -> None:
+    # flushes the records still queued in production mode
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+def configure_logging(settings: Optional[dict] = None, stream: Optional[TextIO] = None) -> Optional[QueueListener]:
+    global listener
+    settings = settings or {}
+    mode = settings.get('mode', 'debug')
+    if mode not in MODES:
+        raise ValueError(f"Unknown logging mode {mode}, expected one of {MODES}")
+    stop_logging()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+
+    if mode == 'debug':
+        root.setLevel(logging.DEBUG)
+        root.addHandler(handler)
+        return None
+
+    # production: records are handed to a queue and formatted/written by a listener thread
+    root.setLevel(getattr(logging, str(settings.get('level', 'INFO')).upper()))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(records))
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+atexit.register(stop_logging)
@@ -0,0 +1,116 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def format_labels(labels: Dict[str, str], extra: str = '') -> str:
+    items = [f'{key}="{str(value)}"' for key, value in labels.items()]
+    if extra:
+        items.append(extra)
+    return '{' + ','.join(items) + '}' if items else ''
+
+class Counter:
+    __slots__ = ('labels', 'value')
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        self.labels = labels or {}
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def collect(self, name: str) -> List[str]:
+        return [f'{name}{format_labels(self.labels)} {self.value}']
+
+class Gauge:
+    __slots__ = ('labels', 'value', 'func')
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None, func: Optional[Callable[[], float]] = None):
+        self.labels = labels or {}
+        self.value = 0
+        # read at scrape time, so the hot path does not touch the gauge at all
+        self.func = func
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def collect(self, name: str) -> List[str]:
+        value = self.func() if self.func else self.value
+        return [f'{name}{format_labels(self.labels)} {value}']
+
+class Histogram:
+    __slots__ = ('labels', 'buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS, labels: Optional[Dict[str, str]] = None):
+        self.labels = labels or {}
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def collect(self, name: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f'{name}_bucket{format_labels(self.labels, le)} {cumulative}')
+        le = 'le="+Inf"'
+        lines.append(f'{name}_bucket{format_labels(self.labels, le)} {self.count}')
+        lines.append(f'{name}_sum{format_labels(self.labels)} {self.sum}')
+        lines.append(f'{name}_count{format_labels(self.labels)} {self.count}')
+        return lines
+
+Metric = Union[Counter, Gauge, Histogram]
+
+class MetricsRegistry:
+    def __init__(self):
+        # name -> (type, help, metrics of that family)
+        self.families: Dict[str, Tuple[str, str, List[Metric]]] = {}
+
+    def register(self, name: str, kind: str, help: str, metric: Metric) -> Metric:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = (kind, help, [])
+        elif family[0] != kind:
+            raise ValueError(f"Metric {name} already registered as {family[0]}")
+        family[2].append(metric)
+        return metric
+
+    def unregister(self, name: str, metric: Metric) -> None:
+        family = self.families.get(name)
+        if family and metric in family[2]:
+            family[2].remove(metric)
+
+    def counter(self, name: str, help: str, labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self.register(name, 'counter', help, Counter(labels))
+
+    def gauge(self, name: str, help: str, labels: Optional[Dict[str, str]] = None, func: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(name, 'gauge', help, Gauge(labels, func))
+
+    def counter_func(self, name: str, help: str, func: Callable[[], float], labels: Optional[Dict[str, str]] = None) -> Gauge:
+        # counter whose value already lives on a component, e.g. SBSParser.lines
+        return self.register(name, 'counter', help, Gauge(labels, func))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS, labels: Optional[Dict[str, str]] = None) -> Histogram:
+        return self.register(name, 'histogram', help, Histogram(buckets, labels))
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help, metrics) in self.families.items():
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+            for metric in metrics:
+                try:
+                    lines.extend(metric.collect(name))
+                except Exception as e:
+                    logger.error(f"Error collecting metric {name}: {e}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,260 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from src.domain.ports import IReceiver
+from src.domain.models import Aircraft
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.metrics import MetricsRegistry
+import pyModeS as pms
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+BEAST_ESCAPE = 0x1a
+# beast frame type -> mode-s/mode-ac message length in bytes
+BEAST_LENGTHS = {0x31: 2, 0x32: 7, 0x33: 14}
+BEAST_META = 7  # 6 byte MLAT timestamp + 1 byte signal level
+
+class BeastFramer:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        self.buffer += chunk
+        buffer = self.buffer
+        end = len(buffer)
+        frames = []
+        pos = 0
+        while True:
+            start = buffer.find(BEAST_ESCAPE, pos)
+            if start < 0:
+                pos = end
+                break
+            if start + 1 >= end:
+                pos = start
+                break
+            length = BEAST_LENGTHS.get(buffer[start + 1])
+            if length is None:
+                # escaped 0x1a or unknown frame type, resync on the next escape
+                pos = start + (2 if buffer[start + 1] == BEAST_ESCAPE else 1)
+                continue
+
+            needed = BEAST_META + length
+            frame = bytearray()
+            i = start + 2
+            complete = truncated = False
+            while i < end:
+                byte = buffer[i]
+                if byte == BEAST_ESCAPE:
+                    if i + 1 >= end:
+                        break
+                    if buffer[i + 1] != BEAST_ESCAPE:
+                        truncated = True
+                        break
+                    i += 1
+                frame.append(byte)
+                i += 1
+                if len(frame) == needed:
+                    complete = True
+                    break
+
+            if truncated:
+                pos = i
+                continue
+            if not complete:
+                pos = start
+                break
+            frames.append(bytes(frame[BEAST_META:]))
+            pos = i
+
+        del buffer[:pos]
+        return frames
+
+class RawFramer:
+    def __init__(self):
+        self.remainder = b''
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        data = self.remainder + chunk if self.remainder else chunk
+        lines = data.split(b'\n')
+        self.remainder = lines.pop()
+        frames = []
+        for line in lines:
+            line = line.strip().rstrip(b';')
+            if line.startswith(b'@'):
+                line = line[13:]
+            elif line.startswith(b'*'):
+                line = line[1:]
+            if line:
+                try:
+                    frames.append(bytes.fromhex(line.decode('ascii')))
+                except ValueError:
+                    continue
+        return frames
+
+class CPRState:
+    __slots__ = ('even', 'even_time', 'odd', 'odd_time', 'ref_lat', 'ref_lon', 'ref_time')
+
+    def __init__(self):
+        self.even: Optional[str] = None
+        self.even_time = 0.0
+        self.odd: Optional[str] = None
+        self.odd_time = 0.0
+        self.ref_lat: Optional[float] = None
+        self.ref_lon: Optional[float] = None
+        self.ref_time = 0.0
+
+class ModeSDecoder:
+    def __init__(self, store: AircraftStore, reference: Optional[Tuple[float, float]] = None, pair_timeout: float = 10.0, ref_max_age: float = 180.0):
+        self.store = store
+        self.reference = reference
+        self.pair_timeout = pair_timeout
+        self.ref_max_age = ref_max_age
+        self.cpr: Dict[str, CPRState] = {}
+        self.last_expire = time.monotonic()
+        self.decoded = 0
+        self.rejected = 0
+        self.local_decodes = 0
+        self.global_decodes = 0
+
+    def decode(self, frame: bytes, now: Optional[float] = None) -> Optional[Aircraft]:
+        if len(frame) != 14 or (frame[0] >> 3) not in (17, 18):
+            return None
+        msg = frame.hex().upper()
+        try:
+            if pms.crc(msg) != 0:
+                self.rejected += 1
+                return None
+
+            now = time.monotonic() if now is None else now
+            icao = pms.icao(msg)
+            tc = pms.adsb.typecode(msg)
+            timestamp = datetime.now()
+            aircraft = None
+
+            if 1 <= tc <= 4:
+                aircraft = self.store.update(1, icao, timestamp, callsign=pms.adsb.callsign(msg).strip('_ ') or None)
+            elif 9 <= tc <= 18 or 20 <= tc <= 22:
+                altitude = pms.adsb.altitude(msg)
+                position = self.position(icao, msg, now)
+                if position:
+                    aircraft = self.store.update(3, icao, timestamp, altitude=altitude, latitude=position[0], longitude=position[1])
+                elif altitude is not None:
+                    aircraft = self.store.update(7, icao, timestamp, altitude=altitude)
+            elif tc == 19:
+                velocity = pms.adsb.velocity(msg)
+                if velocity and velocity[0] is not None and velocity[1] is not None:
+                    aircraft = self.store.update(4, icao, timestamp, speed=float(velocity[0]), heading=float(velocity[1]))
+
+            if aircraft is not None:
+                self.decoded += 1
+            return aircraft
+        except Exception as e:
+            self.rejected += 1
+            logger.debug(f"Error decoding Mode-S message {msg}: {e}")
+            return None
+
+    def position(self, icao: str, msg: str, now: float) -> Optional[Tuple[float, float]]:
+        state = self.cpr.get(icao)
+        if state is None:
+            state = self.cpr[icao] = CPRState()
+
+        if pms.adsb.oe_flag(msg):
+            state.odd, state.odd_time = msg, now
+        else:
+            state.even, state.even_time = msg, now
+
+        position = None
+        if state.ref_lat is not None and now - state.ref_time <= self.ref_max_age:
+            position = pms.adsb.airborne_position_with_ref(msg, state.ref_lat, state.ref_lon)
+            self.local_decodes += 1
+        elif state.even and state.odd and abs(state.even_time - state.odd_time) <= self.pair_timeout:
+            position = pms.adsb.airborne_position(state.even, state.odd, state.even_time, state.odd_time)
+            self.global_decodes += 1
+        elif self.reference is not None:
+            position = pms.adsb.airborne_position_with_ref(msg, self.reference[0], self.reference[1])
+            self.local_decodes += 1
+
+        if position:
+            state.ref_lat, state.ref_lon, state.ref_time = position[0], position[1], now
+        return position
+
+    def expire(self, now: float, max_age: float) -> None:
+        if now - self.last_expire < 1.0:
+            return
+        self.last_expire = now
+        for icao in [icao for icao, state in self.cpr.items() if now - max(state.even_time, state.odd_time) > max_age]:
+            del self.cpr[icao]
+
+class ModeSReceiver(IReceiver):
+    FORMATS = ('beast', 'raw')
+
+    def __init__(self, host: str, port: int, format: str = 'beast', reconnect_delay: float = 5.0, store: Optional[AircraftStore] = None,
+                 reference: Optional[Tuple[float, float]] = None, chunk_size: int = 65536):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown Mode-S feed format {format}, expected one of {self.FORMATS}")
+        self.host = host
+        self.port = port
+        self.format = format
+        self.reconnect_delay = reconnect_delay
+        self.chunk_size = chunk_size
+        self.aircrafts: AircraftStore = store if store is not None else AircraftStore()
+        self.decoder = ModeSDecoder(self.aircrafts, reference=tuple(reference) if reference else None)
+        self.task: Optional[asyncio.Task] = None
+        self.stopping = asyncio.Event()
+        self.callback: Callable[[Aircraft], Awaitable[None]] | None = None
+        logger.info(f"Initialized ModeSReceiver with host: {host}, port: {port}, format: {format}, reconnect_delay: {reconnect_delay}")
+
+    def register_callback(self, callback: Callable[[Aircraft], Awaitable[None]]) -> None:
+        self.callback = callback
+        logger.info(f"Registered callback for ModeSReceiver")
+
+    def start(self) -> None:
+        if not self.task:
+            self.stopping.clear()
+            self.task = asyncio.create_task(self.run())
+            logger.info(f"Started ModeSReceiver")
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.task:
+            self.task.cancel()
+        self.task = None
+        logger.info(f"Stopped ModeSReceiver, decoded: {self.decoder.decoded}, rejected: {self.decoder.rejected}, aircraft store: {self.aircrafts.stats()}")
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        labels = {'feed': f'{self.host}:{self.port}'}
+        registry.counter_func('modes_receiver_decoded_total', 'ADS-B messages decoded into the aircraft store', lambda: self.decoder.decoded, labels)
+        registry.counter_func('modes_receiver_rejected_total', 'Mode-S frames rejected by CRC or decoding', lambda: self.decoder.rejected, labels)
+        registry.counter_func('modes_receiver_cpr_local_total', 'CPR positions decoded against a reference', lambda: self.decoder.local_decodes, labels)
+        registry.counter_func('modes_receiver_cpr_global_total', 'CPR positions decoded from an even/odd pair', lambda: self.decoder.global_decodes, labels)
+
+    async def run(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                logger.info(f"Connecting to {self.host}:{self.port}")
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                framer = BeastFramer() if self.format == 'beast' else RawFramer()
+                try:
+                    while not self.stopping.is_set() and self.callback:
+                        chunk = await reader.read(self.chunk_size)
+                        if not chunk:
+                            break
+
+                        now = time.monotonic()
+                        for frame in framer.feed(chunk):
+                            aircraft = self.decoder.decode(frame, now)
+                            if aircraft and aircraft.valid():
+                                await self.callback(aircraft)
+                        self.decoder.expire(now, self.aircrafts.ttl)
+                finally:
+                    try:
+                        writer.close()
+                        await writer.wait_closed()
+                    except Exception as e:
+                        logger.error(f"Error closing writer: {e}")
+            except Exception as e:
+                logger.error(f"Error in ModeSReceiver: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
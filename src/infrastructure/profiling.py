@@ -0,0 +1,269 @@
+from collections import Counter
+from types import CodeType
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+Frame = Tuple[str, str, int]
+
+def timestamp() -> str:
+    return time.strftime('%Y%m%d-%H%M%S')
+
+def last_line(code: CodeType) -> int:
+    # includes nested comprehensions and closures, which have their own code objects
+    lines = [line for _, _, line in code.co_lines() if line is not None]
+    nested = [last_line(const) for const in code.co_consts if isinstance(const, CodeType)]
+    return max(lines + nested + [code.co_firstlineno])
+
+def line_ranges(objects: Sequence[object]) -> List[Tuple[str, int, int]]:
+    # (filename, first line, last line) of functions, or of every method of a class
+    ranges = []
+    for obj in objects:
+        functions = [value for value in vars(obj).values() if inspect.isfunction(value)] if isinstance(obj, type) else [obj]
+        for function in functions:
+            code = function.__code__
+            ranges.append((code.co_filename, code.co_firstlineno, last_line(code)))
+    return ranges
+
+class SamplingProfiler:
+    # samples the event loop thread's stack from a helper thread, the loop itself does no extra work
+    def __init__(self, interval: float = 0.005, max_depth: int = 64, slow_callback: float = 0.05):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.slow_callback = slow_callback
+        self.stacks: Counter = Counter()
+        self.tasks: Counter = Counter()
+        # (wall clock, seconds, samples, task, most sampled stack) per loop iteration over slow_callback
+        self.slow: List[Tuple[float, float, int, str, Tuple[Frame, ...]]] = []
+        self.samples = 0
+        self.started = 0.0
+        self.elapsed = 0.0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread_id: Optional[int] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.stacks.clear()
+        self.tasks.clear()
+        self.slow = []
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.elapsed = time.perf_counter() - self.started
+
+    def run(self) -> None:
+        # the loop is idle while its thread sits in selector.select(), every stretch between two idle samples is one
+        # loop iteration, those longer than slow_callback are logged with the stack and task seen most during them
+        busy_since: Optional[float] = None
+        busy_stacks: Counter = Counter()
+        while not self.stopping.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            idle = frame.f_code.co_name == 'select' and frame.f_code.co_filename.endswith('selectors.py')
+            stack: List[Frame] = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                frame = frame.f_back
+            task = asyncio.current_task(self.loop)
+            name = getattr(task.get_coro(), '__qualname__', task.get_name()) if task else '(event loop)'
+            stack.reverse()
+            self.tasks[name] += 1
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+            if not idle:
+                if busy_since is None:
+                    busy_since = now
+                busy_stacks[(name, tuple(stack))] += 1
+            elif busy_since is not None:
+                self.end_stretch(now - busy_since, busy_stacks)
+                busy_since = None
+                busy_stacks = Counter()
+        if busy_since is not None:
+            self.end_stretch(time.perf_counter() - busy_since, busy_stacks)
+
+    def end_stretch(self, seconds: float, stacks: Counter) -> None:
+        if seconds >= self.slow_callback:
+            (name, stack), _ = stacks.most_common(1)[0]
+            self.slow.append((time.time() - seconds, seconds, sum(stacks.values()), name, stack))
+
+    def slow_report(self) -> str:
+        lines = []
+        for started, seconds, samples, name, stack in self.slow:
+            lines.append(f'{time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started))} - loop iteration took {seconds * 1000:.1f}ms '
+                         f'({samples} samples) in {name}:')
+            lines += [f'    {function} {filename}:{line}' for filename, function, line in stack[-12:]]
+        return '\n'.join(lines) + '\n' if lines else 'no loop iteration over the slow_callback threshold\n'
+
+    def collapsed(self) -> str:
+        # flamegraph.pl / speedscope folded stacks
+        lines = []
+        for stack, count in self.stacks.most_common():
+            lines.append(';'.join(f'{name} ({os.path.basename(filename)}:{line})' for filename, name, line in stack) + f' {count}')
+        return '\n'.join(lines) + '\n'
+
+    def report(self, top: int = 40) -> str:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+
+        samples = max(self.samples, 1)
+        lines = [f'{self.samples} samples over {self.elapsed:.1f}s every {self.interval * 1000:.1f}ms', '', 'per task (coroutine):']
+        for name, count in self.tasks.most_common(top):
+            lines.append(f'{100 * count / samples:6.1f}% {count:8d}  {name}')
+        for title, counter in (('self time per function:', own), ('total time per function:', total)):
+            lines += ['', title]
+            for (filename, name, line), count in counter.most_common(top):
+                lines.append(f'{100 * count / samples:6.1f}% {count:8d}  {name} {filename}:{line}')
+        return '\n'.join(lines) + '\n'
+
+class LoopMonitor:
+    # event loop lag from a periodic sleep, asyncio debug mode is left off, it would slow every callback down
+    def __init__(self, interval: float = 0.1, slow_callback: float = 0.05):
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.lags: List[float] = []
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.lags = []
+        self.task = loop.create_task(self.run())
+
+    def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - started - self.interval))
+
+    def report(self) -> str:
+        if not self.lags:
+            return 'loop lag: no samples\n'
+        lags = sorted(self.lags)
+        def percentile(p: float) -> float:
+            return lags[min(len(lags) - 1, int(p * len(lags)))] * 1000
+        return (f'loop lag over {len(lags)} samples every {self.interval * 1000:.0f}ms: '
+                f'p50 {percentile(0.5):.2f}ms, p99 {percentile(0.99):.2f}ms, max {lags[-1] * 1000:.2f}ms, '
+                f'over {self.slow_callback * 1000:.0f}ms: {sum(1 for lag in lags if lag > self.slow_callback)}\n')
+
+class ProfilingHooks:
+    # SIGUSR1 starts / stops a CPU session (sampling profiler, loop lag, slow callbacks),
+    # SIGUSR2 starts / stops tracemalloc and writes a snapshot, nothing runs until a signal arrives
+    def __init__(self, output_dir: str = 'profiles', sample_interval: float = 0.005, lag_interval: float = 0.1, slow_callback: float = 0.05,
+                 tracemalloc_frames: int = 10, components: Optional[Dict[str, Callable[[], int]]] = None,
+                 sites: Optional[Dict[str, Sequence[object]]] = None):
+        self.output_dir = output_dir
+        self.tracemalloc_frames = tracemalloc_frames
+        # name -> estimated bytes, e.g. the aircraft table or client send buffers
+        self.components = components or {}
+        # name -> functions or classes, allocations made directly in their code are attributed to it
+        self.sites = {name: line_ranges(objects) for name, objects in (sites or {}).items()}
+        self.profiler = SamplingProfiler(sample_interval, slow_callback=slow_callback)
+        self.monitor = LoopMonitor(lag_interval, slow_callback)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.profiling: Optional[str] = None
+        logger.info(f"Initialized ProfilingHooks with output_dir: {output_dir}, sample_interval: {sample_interval}")
+
+    def install(self, loop: asyncio.AbstractEventLoop) -> None:
+        if not hasattr(signal, 'SIGUSR1'):
+            logger.warning(f"Profiling hooks need SIGUSR1/SIGUSR2, not available on this platform")
+            return
+        self.loop = loop
+        loop.add_signal_handler(signal.SIGUSR1, self.toggle_profiling)
+        loop.add_signal_handler(signal.SIGUSR2, self.toggle_tracemalloc)
+        logger.info(f"Profiling hooks installed, kill -USR1 {os.getpid()} for CPU, kill -USR2 {os.getpid()} for memory")
+
+    def path(self, name: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, name)
+
+    def toggle_profiling(self) -> None:
+        if self.profiling is None:
+            self.profiling = timestamp()
+            self.profiler.start(self.loop)
+            self.monitor.start(self.loop)
+            logger.info(f"Started profiling, send SIGUSR1 again to stop")
+            return
+
+        self.profiler.stop()
+        self.monitor.stop()
+        report = self.path(f'profile-{self.profiling}.txt')
+        with open(report, 'w') as f:
+            f.write(self.monitor.report() + '\n' + self.profiler.report())
+        with open(self.path(f'profile-{self.profiling}.collapsed'), 'w') as f:
+            f.write(self.profiler.collapsed())
+        with open(self.path(f'slow-callbacks-{self.profiling}.log'), 'w') as f:
+            f.write(self.profiler.slow_report())
+        self.profiling = None
+        logger.info(f"Stopped profiling, wrote {report}")
+
+    def toggle_tracemalloc(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            logger.info(f"Started tracemalloc, send SIGUSR2 again for a snapshot")
+            return
+
+        snapshot = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report = self.path(f'memory-{timestamp()}.txt')
+        with open(report, 'w') as f:
+            f.write(self.memory_report(snapshot, traced, peak))
+        logger.info(f"Stopped tracemalloc, wrote {report}")
+
+    def memory_report(self, snapshot: tracemalloc.Snapshot, traced: int, peak: int, top: int = 30) -> str:
+        lines = [f'traced since SIGUSR2: {traced / 1024:.1f} KiB live, {peak / 1024:.1f} KiB peak', '', 'estimated size per component:']
+        for name, size in self.components.items():
+            try:
+                lines.append(f'{size() / 1024:12.1f} KiB  {name}')
+            except Exception as e:
+                lines.append(f'{"?":>12}      {name} ({e})')
+
+        # grouped by the innermost frame only, so an allocation counts once, for the code that made it,
+        # not for every caller up the stack (the receiver loop is a caller of nearly everything)
+        statistics = snapshot.statistics('lineno')
+        lines += ['', 'live allocations since SIGUSR2 per component (allocation sites):']
+        for name, ranges in self.sites.items():
+            size = 0
+            for stat in statistics:
+                frame = stat.traceback[0]
+                if any(frame.filename == filename and first <= frame.lineno <= last for filename, first, last in ranges):
+                    size += stat.size
+            lines.append(f'{size / 1024:12.1f} KiB  {name}')
+
+        lines += ['', 'top allocation sites:']
+        for stat in statistics[:top]:
+            frame = stat.traceback[0]
+            lines.append(f'{stat.size / 1024:12.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}')
+        return '\n'.join(lines) + '\n'
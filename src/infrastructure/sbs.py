@@ -0,0 +1,88 @@
+from typing import List, Optional, Union
+from src.domain.models import Aircraft
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.utils import TimestampAdjuster
+import logging
+
+logger = logging.getLogger(__name__)
+
+# SBS-1 BaseStation field indexes
+MSG_TYPE = 1
+ICAO = 4
+DATE = 6
+TIME = 7
+CALLSIGN = 10
+ALTITUDE = 11
+SPEED = 12
+HEADING = 13
+LATITUDE = 14
+LONGITUDE = 15
+FIELD_COUNT = 22
+
+class SBSParser:
+    def __init__(self, store: AircraftStore, adjuster: TimestampAdjuster):
+        self.store = store
+        self.adjuster = adjuster
+        self.remainder = b''
+        self.lines = 0
+        self.failures = 0
+        self.duplicates = 0
+
+    def parse_aircraft(self, text: Union[str, bytes]) -> Optional[Aircraft]:
+        if isinstance(text, str):
+            text = text.encode('utf-8', errors='ignore')
+        return self.parse_line(text.strip())
+
+    def split(self, buffer: bytes) -> List[bytes]:
+        data = self.remainder + buffer if self.remainder else buffer
+        lines = data.split(b'\n')
+        self.remainder = lines.pop()
+        return lines
+
+    def parse_many(self, buffer: bytes) -> List[Aircraft]:
+        # store records are updated in place, so an aircraft seen several times
+        # in the buffer is returned once per line but always holds its final state
+        parse_line = self.parse_line
+        aircrafts = []
+        for line in self.split(buffer):
+            aircraft = parse_line(line.strip())
+            if aircraft is not None:
+                aircrafts.append(aircraft)
+        return aircrafts
+
+    def reset(self) -> None:
+        self.remainder = b''
+
+    def parse_line(self, line: bytes) -> Optional[Aircraft]:
+        if not line:
+            return None
+        self.lines += 1
+        if not line.startswith(b'MSG') or line.count(b',') < FIELD_COUNT - 1:
+            return None
+
+        try:
+            parts = line.split(b',', LONGITUDE + 1)
+            msg_type = int(parts[MSG_TYPE])
+            icao = parts[ICAO].strip().decode('utf-8', errors='ignore')
+            timestamp = self.adjuster.adjust_parts(parts[DATE].decode('utf-8', errors='ignore'), parts[TIME].decode('utf-8', errors='ignore'))
+
+            callsign = altitude = speed = heading = latitude = longitude = None
+            if msg_type == 1 or msg_type == 5 or msg_type == 6:
+                callsign = parts[CALLSIGN].strip().decode('utf-8', errors='ignore') or None
+            if msg_type == 3 or msg_type == 5 or msg_type == 7:
+                altitude = int(parts[ALTITUDE]) if parts[ALTITUDE] else None
+            if msg_type == 2 or msg_type == 4:
+                speed = float(parts[SPEED]) if parts[SPEED] else None
+                heading = float(parts[HEADING]) if parts[HEADING] else None
+            if msg_type == 2 or msg_type == 3:
+                latitude = float(parts[LATITUDE]) if parts[LATITUDE] else None
+                longitude = float(parts[LONGITUDE]) if parts[LONGITUDE] else None
+
+            aircraft = self.store.update(msg_type, icao, timestamp, callsign, altitude, speed, heading, latitude, longitude)
+            if aircraft is None and 1 <= msg_type <= 8:
+                self.duplicates += 1
+            return aircraft
+        except Exception as e:
+            self.failures += 1
+            logger.error("Error parsing aircraft: %s", e)
+            return None
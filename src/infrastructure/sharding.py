@@ -0,0 +1,166 @@
+from datetime import datetime
+from typing import List, Optional
+from src.domain.ports import ISender
+from src.infrastructure.adapters import AisMessageBuilder
+from src.infrastructure.sbs import SBSParser, ICAO
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.metrics import MetricsRegistry
+from src.infrastructure.utils import TimestampAdjuster
+import multiprocessing
+import queue
+import asyncio
+import logging
+import os
+import zlib
+
+logger = logging.getLogger(__name__)
+
+def shard_worker(index: int, inbox: multiprocessing.Queue, outbox: multiprocessing.Queue, start_time: datetime, ttl: float, max_size: int) -> None:
+    parser = SBSParser(AircraftStore(ttl=ttl, max_size=max_size), TimestampAdjuster(start_time=start_time))
+    builder = AisMessageBuilder()
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        sentences = []
+        for line in batch.split(b'\n'):
+            aircraft = parser.parse_line(line)
+            if aircraft is not None and aircraft.valid():
+                sentences.append(builder.encode_type9(aircraft))
+        if sentences:
+            outbox.put((index, sentences))
+    outbox.put((index, None))
+
+class ShardedPipeline:
+    def __init__(self, host: str, port: int, sender: ISender, workers: Optional[int] = None, start_time: Optional[datetime] = None,
+                 reconnect_delay: float = 5.0, chunk_size: int = 65536, queue_size: int = 64, ttl: float = 300.0, max_size: int = 10000,
+                 start_method: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.workers = workers or os.cpu_count() or 1
+        self.start_time = start_time or datetime.now()
+        self.reconnect_delay = reconnect_delay
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self.max_size = max_size
+        self.context = multiprocessing.get_context(start_method)
+        self.inboxes: List[multiprocessing.Queue] = []
+        self.outbox: Optional[multiprocessing.Queue] = None
+        self.processes: List[multiprocessing.Process] = []
+        self.remainder = b''
+        self.tasks: List[asyncio.Task] = []
+        self.stopping = asyncio.Event()
+        self.lines = 0
+        self.sentences = 0
+        logger.info(f"Initialized ShardedPipeline with host: {host}, port: {port}, workers: {self.workers}")
+
+    def start_workers(self) -> None:
+        self.outbox = self.context.Queue()
+        for index in range(self.workers):
+            inbox = self.context.Queue(self.queue_size)
+            process = self.context.Process(
+                target=shard_worker,
+                args=(index, inbox, self.outbox, self.start_time, self.ttl, self.max_size),
+                name=f'ais-shard-{index}',
+                daemon=True
+            )
+            process.start()
+            self.inboxes.append(inbox)
+            self.processes.append(process)
+        logger.info(f"Started {self.workers} shard workers")
+
+    def stop_workers(self, timeout: float = 5.0) -> None:
+        for inbox in self.inboxes:
+            try:
+                inbox.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.inboxes.clear()
+        self.processes.clear()
+        logger.info(f"Stopped shard workers, lines: {self.lines}, sentences: {self.sentences}")
+
+    def route(self, chunk: bytes) -> List[List[bytes]]:
+        data = self.remainder + chunk if self.remainder else chunk
+        lines = data.split(b'\n')
+        self.remainder = lines.pop()
+
+        shards: List[List[bytes]] = [[] for _ in range(self.workers)]
+        workers = self.workers
+        for line in lines:
+            parts = line.split(b',', ICAO + 1)
+            if len(parts) <= ICAO:
+                continue
+            # every line of an aircraft goes to the same worker, which keeps its order
+            shards[zlib.crc32(parts[ICAO].strip()) % workers].append(line)
+        self.lines += len(lines)
+        return shards
+
+    async def dispatch(self, chunk: bytes) -> None:
+        loop = asyncio.get_running_loop()
+        for inbox, lines in zip(self.inboxes, self.route(chunk)):
+            if not lines:
+                continue
+            batch = b'\n'.join(lines)
+            try:
+                inbox.put_nowait(batch)
+            except queue.Full:
+                await loop.run_in_executor(None, inbox.put, batch)
+
+    async def pump(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            index, sentences = await loop.run_in_executor(None, self.outbox.get)
+            if sentences is None:
+                continue
+            self.sentences += len(sentences)
+            for sentence in sentences:
+                await self.sender.send(sentence)
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        registry.counter_func('sharded_pipeline_lines_total', 'SBS lines routed to shard workers', lambda: self.lines)
+        registry.counter_func('sharded_pipeline_sentences_total', 'NMEA sentences returned by shard workers', lambda: self.sentences)
+        registry.gauge('sharded_pipeline_workers', 'Shard worker processes', func=lambda: len(self.processes))
+
+    def start(self) -> None:
+        if not self.tasks:
+            self.stopping.clear()
+            self.start_workers()
+            self.tasks = [asyncio.create_task(self.run()), asyncio.create_task(self.pump())]
+            logger.info(f"Started ShardedPipeline")
+
+    def stop(self) -> None:
+        self.stopping.set()
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        self.stop_workers()
+        logger.info(f"Stopped ShardedPipeline")
+
+    async def run(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                logger.info(f"Connecting to {self.host}:{self.port}")
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                self.remainder = b''
+                try:
+                    while not self.stopping.is_set():
+                        chunk = await reader.read(self.chunk_size)
+                        if not chunk:
+                            break
+                        await self.dispatch(chunk)
+                finally:
+                    try:
+                        writer.close()
+                        await writer.wait_closed()
+                    except Exception as e:
+                        logger.error(f"Error closing writer: {e}")
+            except Exception as e:
+                logger.error(f"Error in ShardedPipeline: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
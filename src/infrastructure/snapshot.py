@@ -0,0 +1,161 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from src.domain.models import Aircraft
+from src.infrastructure.metrics import MetricsRegistry
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.subscriptions import EARTH_RADIUS_KM
+import numpy as np
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('latitude', 'longitude', 'altitude', 'speed', 'heading', 'seen')
+# 40 bytes per aircraft in binary query responses, missing values are NaN, decode with np.frombuffer(body, RECORD)
+RECORD = np.dtype([
+    ('icao', 'S8'),
+    ('latitude', '<f4'),
+    ('longitude', '<f4'),
+    ('altitude', '<f4'),
+    ('speed', '<f4'),
+    ('heading', '<f4'),
+    ('distance', '<f4'),
+    ('seen', '<f8')
+])
+FORMATS = ('json', 'binary')
+
+def parse_floats(name: str, value: str, count: int) -> List[float]:
+    try:
+        values = [float(part) for part in value.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid {name} {value}, expected {count} comma separated numbers")
+    if len(values) != count:
+        raise ValueError(f"Invalid {name} {value}, expected {count} comma separated numbers")
+    return values
+
+class TrafficSnapshot:
+    # live aircraft state as one NumPy column per field, updated in place by the store listeners,
+    # slots of expired aircraft go to a free list and are reused by the next new ICAO
+    def __init__(self, capacity: int = 1024, max_results: int = 10000, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.max_results = max_results
+        self.icao = np.zeros(capacity, dtype='S8')
+        self.columns: Dict[str, np.ndarray] = {name: np.full(capacity, np.nan) for name in COLUMNS}
+        self.used = np.zeros(capacity, dtype=bool)
+        self.slots: Dict[str, int] = {}
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+        self.queries = 0
+        logger.info(f"Initialized TrafficSnapshot with capacity: {capacity}, max_results: {max_results}")
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def attach(self, store: AircraftStore) -> None:
+        for aircraft in store:
+            self.update(aircraft)
+        store.listeners.append(self.update)
+        store.removal_listeners.append(self.remove)
+
+    def grow(self) -> None:
+        capacity = len(self.used)
+        self.icao = np.concatenate((self.icao, np.zeros(capacity, dtype='S8')))
+        for name, column in self.columns.items():
+            self.columns[name] = np.concatenate((column, np.full(capacity, np.nan)))
+        self.used = np.concatenate((self.used, np.zeros(capacity, dtype=bool)))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def update(self, aircraft: Aircraft) -> None:
+        slot = self.slots.get(aircraft.icao)
+        if slot is None:
+            if not self.free:
+                self.grow()
+            slot = self.slots[aircraft.icao] = self.free.pop()
+            self.icao[slot] = aircraft.icao.encode('ascii', 'replace')
+            self.used[slot] = True
+        columns = self.columns
+        for name in ('latitude', 'longitude', 'altitude', 'speed', 'heading'):
+            value = getattr(aircraft, name)
+            columns[name][slot] = np.nan if value is None else value
+        columns['seen'][slot] = self.clock()
+
+    def remove(self, icao: str) -> None:
+        slot = self.slots.pop(icao, None)
+        if slot is None:
+            return
+        self.used[slot] = False
+        self.icao[slot] = b''
+        for column in self.columns.values():
+            column[slot] = np.nan
+        self.free.append(slot)
+
+    def select(self, bbox: Optional[List[float]] = None, near: Optional[List[float]] = None, count: int = 10,
+               since: Optional[float] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # slots matching every given filter, nearest first with their distance in km when near is given
+        mask = self.used.copy()
+        lat, lon = self.columns['latitude'], self.columns['longitude']
+        if since is not None:
+            mask &= self.columns['seen'] >= since
+        if bbox is not None:
+            # lat_min, lon_min, lat_max, lon_max like a BBOX subscription, lon_min > lon_max crosses the antimeridian
+            lat_min, lon_min, lat_max, lon_max = bbox
+            mask &= (lat >= lat_min) & (lat <= lat_max)
+            mask &= ((lon >= lon_min) & (lon <= lon_max)) if lon_min <= lon_max else ((lon >= lon_min) | (lon <= lon_max))
+        slots = np.flatnonzero(mask)
+        if near is None:
+            return slots[:self.max_results], None
+
+        slots = slots[~np.isnan(lat[slots]) & ~np.isnan(lon[slots])]
+        center_lat, center_lon = np.radians(near[0]), np.radians(near[1])
+        lat_r, lon_r = np.radians(lat[slots]), np.radians(lon[slots])
+        a = np.sin((lat_r - center_lat) / 2) ** 2 + np.cos(center_lat) * np.cos(lat_r) * np.sin((lon_r - center_lon) / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+        count = min(count, self.max_results, len(slots))
+        if count < len(slots):
+            nearest = np.argpartition(distance, count - 1)[:count]
+            slots, distance = slots[nearest], distance[nearest]
+        order = np.argsort(distance, kind='stable')
+        return slots[order], distance[order]
+
+    def records(self, slots: np.ndarray, distance: Optional[np.ndarray] = None) -> np.ndarray:
+        records = np.empty(len(slots), dtype=RECORD)
+        records['icao'] = self.icao[slots]
+        for name, column in self.columns.items():
+            records[name] = column[slots]
+        records['distance'] = np.nan if distance is None else distance
+        return records
+
+    def to_json(self, slots: np.ndarray, distance: Optional[np.ndarray] = None) -> bytes:
+        # one array per column, NaN becomes null
+        result = {'time': self.clock(), 'count': len(slots), 'icao': [icao.decode('ascii') for icao in self.icao[slots].tolist()]}
+        for name, column in self.columns.items():
+            values = column[slots]
+            result[name] = np.where(np.isnan(values), None, values).tolist()
+        if distance is not None:
+            result['distance'] = distance.tolist()
+        return json.dumps(result, separators=(',', ':')).encode('utf-8')
+
+    def query(self, query: Dict[str, str]) -> Tuple[int, str, bytes]:
+        # HTTPEndpoint handler: ?bbox=lat_min,lon_min,lat_max,lon_max&near=lat,lon&n=10&since=<unix time>&format=json|binary
+        self.queries += 1
+        output = query.get('format', 'json')
+        if output not in FORMATS:
+            raise ValueError(f"Unknown format {output}, expected one of {FORMATS}")
+        bbox = parse_floats('bbox', query['bbox'], 4) if 'bbox' in query else None
+        near = parse_floats('near', query['near'], 2) if 'near' in query else None
+        try:
+            count = int(query.get('n', 10))
+            since = float(query['since']) if 'since' in query else None
+        except ValueError:
+            raise ValueError(f"Invalid n or since in {query}")
+        if count < 1:
+            raise ValueError(f"Invalid n {count}, expected at least 1")
+
+        slots, distance = self.select(bbox, near, count, since)
+        if output == 'binary':
+            return 200, 'application/octet-stream', self.records(slots, distance).tobytes()
+        return 200, 'application/json', self.to_json(slots, distance)
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        registry.gauge('traffic_snapshot_aircraft', 'Aircraft in the columnar snapshot', func=lambda: len(self.slots))
+        registry.gauge('traffic_snapshot_capacity', 'Allocated snapshot slots', func=lambda: len(self.used))
+        registry.counter_func('traffic_snapshot_queries_total', 'Snapshot queries answered', lambda: self.queries)
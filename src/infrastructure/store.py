@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+from src.domain.models import Aircraft
+from src.infrastructure.metrics import MetricsRegistry
+import asyncio
+import sys
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AircraftStore:
+    def __init__(self, ttl: float = 300.0, max_size: int = 10000, sweep_interval: float = 1.0, clock: Callable[[], float] = time.monotonic,
+                 dedup_window: Optional[float] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.dedup_window = timedelta(seconds=dedup_window) if dedup_window is not None else None
+        self.aircrafts: Dict[str, Aircraft] = {}
+        # icao -> last accepted timestamp per SBS message type, only kept when de-duplicating
+        self.stamps: Dict[str, List[Optional[datetime]]] = {}
+        # icao -> last update time, least recently updated first
+        self.last_seen: OrderedDict[str, float] = OrderedDict()
+        self.last_sweep = clock()
+        self.task: Optional[asyncio.Task] = None
+        # called with every accepted update, e.g. TrackLogWriter.append
+        self.listeners: List[Callable[[Aircraft], None]] = []
+        # called with the ICAO of every expired or evicted aircraft, e.g. TrafficSnapshot.remove
+        self.removal_listeners: List[Callable[[str], None]] = []
+        self.inserted = 0
+        self.updated = 0
+        self.expired = 0
+        self.evicted = 0
+        self.duplicates = 0
+        logger.info(f"Initialized AircraftStore with ttl: {ttl}, max_size: {max_size}, dedup_window: {dedup_window}")
+
+    def __len__(self) -> int:
+        return len(self.aircrafts)
+
+    def __contains__(self, icao: str) -> bool:
+        return icao in self.aircrafts
+
+    def __iter__(self) -> Iterator[Aircraft]:
+        return iter(list(self.aircrafts.values()))
+
+    def get(self, icao: str) -> Optional[Aircraft]:
+        return self.aircrafts.get(icao)
+
+    def update(
+        self,
+        msg_type: int,
+        icao: str,
+        timestamp: datetime,
+        callsign: Optional[str] = None,
+        altitude: Optional[int] = None,
+        speed: Optional[float] = None,
+        heading: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> Optional[Aircraft]:
+        if not 1 <= msg_type <= 8:
+            return None
+
+        if self.dedup_window is not None and self.is_duplicate(msg_type, icao, timestamp):
+            self.duplicates += 1
+            return None
+
+        now = self.clock()
+        if now - self.last_sweep >= self.sweep_interval:
+            self.expire(now)
+
+        aircraft = self.aircrafts.get(icao)
+        if aircraft is None:
+            aircraft = Aircraft(icao=icao)
+            self.aircrafts[icao] = aircraft
+            self.inserted += 1
+            if len(self.aircrafts) > self.max_size:
+                oldest, _ = self.last_seen.popitem(last=False)
+                del self.aircrafts[oldest]
+                self.stamps.pop(oldest, None)
+                self.evicted += 1
+                for listener in self.removal_listeners:
+                    listener(oldest)
+        else:
+            self.last_seen.move_to_end(icao)
+            self.updated += 1
+        self.last_seen[icao] = now
+
+        if msg_type == 1 or msg_type == 6:
+            if callsign:
+                aircraft.callsign = callsign
+        elif msg_type == 2:
+            aircraft.latitude = latitude
+            aircraft.longitude = longitude
+            aircraft.heading = heading
+            aircraft.speed = speed
+        elif msg_type == 3:
+            aircraft.altitude = altitude
+            aircraft.latitude = latitude
+            aircraft.longitude = longitude
+        elif msg_type == 4:
+            aircraft.heading = heading
+            aircraft.speed = speed
+        elif msg_type == 5:
+            if callsign:
+                aircraft.callsign = callsign
+            aircraft.altitude = altitude
+        elif msg_type == 7:
+            aircraft.altitude = altitude
+        aircraft.timestamp = timestamp
+        for listener in self.listeners:
+            listener(aircraft)
+        return aircraft
+
+    def start(self) -> None:
+        # update() only sweeps while messages arrive, this keeps aircraft expiring when the feed goes quiet
+        if not self.task:
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+        self.task = None
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            if self.clock() - self.last_sweep >= self.sweep_interval:
+                self.expire()
+
+    def restore(self, aircraft: Aircraft) -> bool:
+        # warm start from a previous run, the aircraft then ages out like one that was just updated
+        if aircraft.icao in self.aircrafts or len(self.aircrafts) >= self.max_size:
+            return False
+        self.aircrafts[aircraft.icao] = aircraft
+        self.last_seen[aircraft.icao] = self.clock()
+        return True
+
+    def is_duplicate(self, msg_type: int, icao: str, timestamp: datetime) -> bool:
+        # the same or an older message of this type already arrived, typically from an overlapping feed
+        stamps = self.stamps.get(icao)
+        if stamps is None:
+            stamps = self.stamps[icao] = [None] * 9
+        last = stamps[msg_type]
+        if last is not None and timestamp <= last + self.dedup_window:
+            return True
+        stamps[msg_type] = timestamp
+        return False
+
+    def expire(self, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        self.last_sweep = now
+        deadline = now - self.ttl
+        count = 0
+        while self.last_seen:
+            icao, seen = next(iter(self.last_seen.items()))
+            if seen > deadline:
+                break
+            self.last_seen.popitem(last=False)
+            del self.aircrafts[icao]
+            self.stamps.pop(icao, None)
+            for listener in self.removal_listeners:
+                listener(icao)
+            count += 1
+        self.expired += count
+        return count
+
+    def memory_usage(self) -> int:
+        # shallow sizes of the tables, the records and their field values
+        size = sys.getsizeof(self.aircrafts) + sys.getsizeof(self.last_seen) + sys.getsizeof(self.stamps)
+        for aircraft in list(self.aircrafts.values()):
+            size += sys.getsizeof(aircraft) + sum(sys.getsizeof(getattr(aircraft, name)) for name in Aircraft.__slots__)
+        return size
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        registry.gauge('aircraft_store_live', 'Aircraft currently tracked', func=lambda: len(self.aircrafts))
+        registry.counter_func('aircraft_store_expired_total', 'Aircraft dropped after ttl without messages', lambda: self.expired)
+        registry.counter_func('aircraft_store_evicted_total', 'Aircraft evicted because the store was full', lambda: self.evicted)
+
+    def stats(self) -> dict:
+        return {
+            'live': len(self.aircrafts),
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'duplicates': self.duplicates
+        }
@@ -0,0 +1,174 @@
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+Bounds = Tuple[float, float, float, float]
+
+class Subscription:
+    KINDS = ('all', 'bbox', 'radius', 'mmsi')
+
+    def __init__(self, kind: str = 'all', bbox: Optional[Bounds] = None, center: Optional[Tuple[float, float]] = None, radius: float = 0.0,
+                 mmsis: Iterable[int] = ()):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown subscription {kind}, expected one of {self.KINDS}")
+        self.kind = kind
+        # lat_min, lon_min, lat_max, lon_max, lon_min > lon_max crosses the antimeridian
+        self.bbox = bbox
+        self.center = center
+        self.radius = radius
+        self.mmsis: FrozenSet[int] = frozenset(mmsis)
+
+    def __repr__(self) -> str:
+        if self.kind == 'bbox':
+            return f"Subscription(bbox={self.bbox})"
+        if self.kind == 'radius':
+            return f"Subscription(center={self.center}, radius={self.radius})"
+        if self.kind == 'mmsi':
+            return f"Subscription(mmsis={sorted(self.mmsis)})"
+        return "Subscription(all)"
+
+    @classmethod
+    def parse(cls, line: str) -> 'Subscription':
+        # ALL | BBOX lat_min lon_min lat_max lon_max | RADIUS lat lon km | MMSI mmsi [mmsi ...], commas or spaces
+        parts = line.replace(',', ' ').split()
+        if not parts:
+            raise ValueError("empty command")
+        command, args = parts[0].upper(), parts[1:]
+        try:
+            if command == 'ALL' and not args:
+                return cls()
+            if command == 'BBOX' and len(args) == 4:
+                lat_min, lon_min, lat_max, lon_max = map(float, args)
+                if not (-90 <= lat_min <= lat_max <= 90 and -180 <= lon_min <= 180 and -180 <= lon_max <= 180):
+                    raise ValueError(f"bbox out of range: {line.strip()}")
+                return cls('bbox', bbox=(lat_min, lon_min, lat_max, lon_max))
+            if command == 'RADIUS' and len(args) == 3:
+                lat, lon, radius = map(float, args)
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180 and radius > 0):
+                    raise ValueError(f"radius out of range: {line.strip()}")
+                return cls('radius', center=(lat, lon), radius=radius)
+            if command == 'MMSI' and args:
+                return cls('mmsi', mmsis=(int(arg) for arg in args))
+        except ValueError as e:
+            raise ValueError(f"invalid command {line.strip()!r}: {e}")
+        raise ValueError(f"invalid command {line.strip()!r}, expected ALL, BBOX, RADIUS or MMSI")
+
+    def bounds(self) -> Optional[Bounds]:
+        if self.kind == 'bbox':
+            return self.bbox
+        if self.kind != 'radius':
+            return None
+        lat, lon = self.center
+        distance = self.radius / EARTH_RADIUS_KM
+        lat_min, lat_max = lat - degrees(distance), lat + degrees(distance)
+        if lat_min <= -90 or lat_max >= 90 or sin(distance) >= cos(radians(lat)):
+            return max(lat_min, -90.0), -180.0, min(lat_max, 90.0), 180.0
+        delta = degrees(asin(sin(distance) / cos(radians(lat))))
+        lon_min, lon_max = lon - delta, lon + delta
+        if lon_min < -180:
+            lon_min += 360
+        if lon_max > 180:
+            lon_max -= 360
+        return lat_min, lon_min, lat_max, lon_max
+
+    def matches(self, mmsi: Optional[int], lat: Optional[float], lon: Optional[float]) -> bool:
+        if self.kind == 'all':
+            return True
+        if self.kind == 'mmsi':
+            return mmsi in self.mmsis
+        if lat is None or lon is None:
+            return False
+        if self.kind == 'bbox':
+            lat_min, lon_min, lat_max, lon_max = self.bbox
+            if not lat_min <= lat <= lat_max:
+                return False
+            return lon_min <= lon <= lon_max if lon_min <= lon_max else (lon >= lon_min or lon <= lon_max)
+        center_lat, center_lon = self.center
+        a = sin(radians(lat - center_lat) / 2) ** 2 + cos(radians(lat)) * cos(radians(center_lat)) * sin(radians(lon - center_lon) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a))) <= self.radius
+
+class SubscriptionIndex:
+    def __init__(self, cell_size: float = 1.0, max_cells: int = 4096):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        # grid cell -> clients whose area overlaps it, so routing only tests the clients of one cell
+        self.cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self.everyone: Set[Hashable] = set()
+        # areas spanning more than max_cells cells are tested on every message instead
+        self.wide: Set[Hashable] = set()
+        self.by_mmsi: Dict[int, Set[Hashable]] = {}
+        self.subscriptions: Dict[Hashable, Tuple[Subscription, List]] = {}
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    @property
+    def filtered(self) -> bool:
+        return len(self.everyone) < len(self.subscriptions)
+
+    def cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return floor(lat / self.cell_size), floor(lon / self.cell_size)
+
+    def cells_for(self, bounds: Bounds) -> Optional[List[Tuple[int, int]]]:
+        lat_min, lon_min, lat_max, lon_max = bounds
+        rows = range(floor(lat_min / self.cell_size), floor(lat_max / self.cell_size) + 1)
+        if lon_min <= lon_max:
+            columns = list(range(floor(lon_min / self.cell_size), floor(lon_max / self.cell_size) + 1))
+        else:
+            columns = list(range(floor(lon_min / self.cell_size), floor(180 / self.cell_size) + 1))
+            columns += range(floor(-180 / self.cell_size), floor(lon_max / self.cell_size) + 1)
+        if len(rows) * len(columns) > self.max_cells:
+            return None
+        return [(row, column) for row in rows for column in columns]
+
+    def subscribe(self, client: Hashable, subscription: Subscription) -> None:
+        self.unsubscribe(client)
+        keys: List = []
+        if subscription.kind == 'all':
+            self.everyone.add(client)
+        elif subscription.kind == 'mmsi':
+            keys = list(subscription.mmsis)
+            for mmsi in keys:
+                self.by_mmsi.setdefault(mmsi, set()).add(client)
+        else:
+            keys = self.cells_for(subscription.bounds())
+            if keys is None:
+                keys = []
+                self.wide.add(client)
+            for key in keys:
+                self.cells.setdefault(key, set()).add(client)
+        self.subscriptions[client] = (subscription, keys)
+
+    def unsubscribe(self, client: Hashable) -> None:
+        entry = self.subscriptions.pop(client, None)
+        if entry is None:
+            return
+        subscription, keys = entry
+        self.everyone.discard(client)
+        self.wide.discard(client)
+        index = self.by_mmsi if subscription.kind == 'mmsi' else self.cells
+        for key in keys:
+            clients = index.get(key)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    del index[key]
+
+    def route(self, mmsi: Optional[int], lat: Optional[float], lon: Optional[float]) -> Set[Hashable]:
+        targets = set(self.everyone)
+        if mmsi is not None and mmsi in self.by_mmsi:
+            targets.update(self.by_mmsi[mmsi])
+        if lat is None or lon is None:
+            return targets
+        candidates = self.cells.get(self.cell(lat, lon))
+        for client in (candidates or ()):
+            if self.subscriptions[client][0].matches(mmsi, lat, lon):
+                targets.add(client)
+        for client in self.wide:
+            if self.subscriptions[client][0].matches(mmsi, lat, lon):
+                targets.add(client)
+        return targets
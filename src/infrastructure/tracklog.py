@@ -0,0 +1,191 @@
+from collections import deque
+from datetime import datetime
+from typing import Deque, Iterator, List, Optional
+from src.domain.models import Aircraft
+from src.infrastructure.store import AircraftStore
+import numpy as np
+import mmap
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ADSBTRK1'
+# 72 bytes per state: wall clock when logged, feed timestamp, fields, missing values are NaN / empty
+RECORD = np.dtype([
+    ('seen', '<f8'),
+    ('time', '<f8'),
+    ('icao', 'S8'),
+    ('callsign', 'S8'),
+    ('altitude', '<f8'),
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('heading', '<f8'),
+    ('speed', '<f8')
+])
+HEADER = np.dtype([('magic', 'S8'), ('record_size', '<u4'), ('reserved', '<u4')])
+
+class TrackLogWriter:
+    def __init__(self, path: str, flush_interval: float = 1.0, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        # filled on the event loop, drained by the writer thread, deque append/popleft are thread safe
+        self.pending: Deque[tuple] = deque()
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.file = None
+        self.written = 0
+        self.rotations = 0
+        logger.info(f"Initialized TrackLogWriter with path: {path}, flush_interval: {flush_interval}, max_bytes: {max_bytes}")
+
+    def append(self, aircraft: Aircraft) -> None:
+        # the store updates aircraft in place, so the fields are copied now
+        self.pending.append((time.time(), aircraft.timestamp, aircraft.icao, aircraft.callsign, aircraft.altitude,
+                             aircraft.latitude, aircraft.longitude, aircraft.heading, aircraft.speed))
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.stopping.clear()
+            self.open()
+            self.thread = threading.Thread(target=self.run, name='track-log', daemon=True)
+            self.thread.start()
+            logger.info(f"Started TrackLogWriter")
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        logger.info(f"Stopped TrackLogWriter, written: {self.written}")
+
+    def open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'ab')
+        size = self.file.tell()
+        # a partial record left by a crash is cut, records appended after it would be misaligned for the reader
+        partial = size if size < HEADER.itemsize else (size - HEADER.itemsize) % RECORD.itemsize
+        if partial:
+            logger.warning(f"Truncating {partial} bytes of a partial record at the end of track log {self.path}")
+            self.file.truncate(size - partial)
+        if size - partial == 0:
+            self.file.write(np.array([(MAGIC, RECORD.itemsize, 0)], dtype=HEADER).tobytes())
+
+    def rotate(self) -> None:
+        self.file.close()
+        os.replace(self.path, f'{self.path}.1')
+        self.rotations += 1
+        self.open()
+
+    def run(self) -> None:
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        rows = []
+        pending = self.pending
+        while pending:
+            # a bad record is skipped, an exception here would end the thread and pending would grow forever
+            try:
+                seen, timestamp, icao, callsign, *values = pending.popleft()
+                rows.append((seen, timestamp.timestamp(), icao.encode('ascii', errors='replace'),
+                             (callsign or '').encode('ascii', errors='replace'), *values))
+            except Exception as e:
+                logger.error(f"Skipping track log record: {e}")
+        if not rows:
+            return
+        try:
+            if self.file.tell() >= self.max_bytes:
+                self.rotate()
+            self.file.write(np.array(rows, dtype=RECORD).tobytes())
+            self.file.flush()
+            self.written += len(rows)
+        except Exception as e:
+            logger.error(f"Error writing track log {self.path}: {e}")
+
+class TrackLogReader:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.itemsize:
+            raise ValueError(f"{path} is not a track log")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.frombuffer(self.map, dtype=HEADER, count=1)[0]
+        if header['magic'] != MAGIC or header['record_size'] != RECORD.itemsize:
+            raise ValueError(f"{path} is not a track log")
+        # a partial record left by a crash is ignored
+        count = (size - HEADER.itemsize) // RECORD.itemsize
+        self.records = np.frombuffer(self.map, dtype=RECORD, count=count, offset=HEADER.itemsize)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Aircraft]:
+        for start in range(0, len(self.records), 4096):
+            for row in self.records[start:start + 4096].tolist():
+                yield to_aircraft(row)
+
+    def close(self) -> None:
+        self.records = None
+        self.map.close()
+        self.file.close()
+
+    def latest(self, since: float) -> np.ndarray:
+        # last state per ICAO among the records logged since the given wall clock time
+        records = self.records[self.records['seen'] >= since]
+        if len(records) == 0:
+            return records
+        _, index = np.unique(records['icao'][::-1], return_index=True)
+        return records[len(records) - 1 - index]
+
+def to_aircraft(row: tuple) -> Aircraft:
+    # row is a record as a tuple of python values, NaN (x != x) means missing
+    _, timestamp, icao, callsign, altitude, latitude, longitude, heading, speed = row
+    return Aircraft(
+        icao=icao.decode('ascii'),
+        callsign=callsign.decode('ascii') or None,
+        altitude=int(altitude) if altitude == altitude else None,
+        latitude=latitude if latitude == latitude else None,
+        longitude=longitude if longitude == longitude else None,
+        heading=heading if heading == heading else None,
+        speed=speed if speed == speed else None,
+        timestamp=datetime.fromtimestamp(timestamp)
+    )
+
+def restore(path: str, store: AircraftStore, max_age: float, now: Optional[float] = None) -> int:
+    # latest state per ICAO from the rotated and the current file, newest wins
+    since = (time.time() if now is None else now) - max_age
+    states: List[np.ndarray] = []
+    for name in (f'{path}.1', path):
+        if not os.path.exists(name):
+            continue
+        try:
+            reader = TrackLogReader(name)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading track log {name}: {e}")
+            continue
+        try:
+            states.append(reader.latest(since).copy())
+        finally:
+            reader.close()
+    if not states:
+        return 0
+
+    records = np.concatenate(states)
+    _, index = np.unique(records['icao'][::-1], return_index=True)
+    latest = records[len(records) - 1 - index]
+    restored = 0
+    for row in latest[np.argsort(latest['seen'], kind='stable')].tolist():
+        if store.restore(to_aircraft(row)):
+            restored += 1
+    logger.info(f"Restored {restored} aircraft from track log {path} newer than {max_age}s")
+    return restored
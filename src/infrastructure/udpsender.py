@@ -0,0 +1,121 @@
+from typing import List, Optional, Sequence, Tuple
+from src.domain.ports import ISender
+from src.infrastructure.metrics import MetricsRegistry
+import ipaddress
+import socket
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+def parse_target(target: str) -> Tuple[str, int]:
+    # host:port with the host resolved once here, sendto() would otherwise do a blocking lookup per datagram
+    host, _, port = target.rpartition(':')
+    if not host or not port.isdecimal():
+        raise ValueError(f"Invalid UDP target {target}, expected host:port")
+    try:
+        ipaddress.IPv4Address(host)
+    except ValueError:
+        try:
+            host = socket.getaddrinfo(host, int(port), socket.AF_INET, socket.SOCK_DGRAM)[0][4][0]
+        except socket.gaierror as e:
+            raise ValueError(f"Cannot resolve UDP target {target}: {e}")
+    return host, int(port)
+
+class UDPAISMessageSender(ISender):
+    def __init__(self, targets: Sequence[str] = ('127.0.0.1:10110',), ttl: int = 1, interface: Optional[str] = None, loopback: bool = True,
+                 max_datagram: int = 1472, batch_interval: float = 0.0, max_buffer: int = 1024 * 1024, unicast_ttl: Optional[int] = None):
+        self.targets: List[Tuple[str, int]] = [parse_target(target) for target in targets]
+        if not self.targets:
+            raise ValueError("UDPAISMessageSender needs at least one target")
+        self.multicast = any(ipaddress.ip_address(host).is_multicast for host, _ in self.targets)
+        # ttl is for multicast groups only, unicast keeps the OS default unless unicast_ttl is given
+        self.ttl = ttl
+        self.unicast_ttl = unicast_ttl
+        self.interface = interface
+        self.loopback = loopback
+        # 1500 byte ethernet MTU minus IP and UDP headers, datagrams are never fragmented
+        self.max_datagram = max_datagram
+        self.batch_interval = batch_interval
+        self.max_buffer = max_buffer
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.pending: List[bytes] = []
+        self.pending_bytes = 0
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.datagrams = 0
+        self.dropped = 0
+        logger.info(f"Initialized UDPAISMessageSender with targets: {targets}, multicast: {self.multicast}, ttl: {ttl}, unicast_ttl: {unicast_ttl}, interface: {interface}")
+
+    def create_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        if self.interface:
+            sock.bind((self.interface, 0))
+        if self.unicast_ttl is not None:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, self.unicast_ttl)
+        if self.multicast:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1 if self.loopback else 0)
+            if self.interface:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.interface))
+        return sock
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, sock=self.create_socket())
+        logger.info(f"Started UDPAISMessageSender to {self.targets}")
+
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            if self.batch_interval > 0:
+                await asyncio.sleep(self.batch_interval)
+            self.flush()
+
+    async def stop(self) -> None:
+        if self.transport:
+            self.flush()
+            self.transport.close()
+            self.transport = None
+        logger.info(f"Stopped UDPAISMessageSender, sent: {self.sent}, datagrams: {self.datagrams}, dropped: {self.dropped}")
+
+    async def send(self, message: str) -> None:
+        if not self.transport:
+            return
+        data = f'{message}\n'.encode('utf-8')
+        if self.batch_interval <= 0:
+            self.write(data, 1)
+            return
+        if self.pending_bytes + len(data) > self.max_datagram:
+            self.flush()
+        self.pending.append(data)
+        self.pending_bytes += len(data)
+        self.ready.set()
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        registry.counter_func('ais_sender_udp_sent_total', 'Sentences sent over UDP', lambda: self.sent)
+        registry.counter_func('ais_sender_udp_datagrams_total', 'Datagrams sent per target', lambda: self.datagrams)
+        registry.counter_func('ais_sender_udp_dropped_total', 'Sentences dropped because the socket buffer was full', lambda: self.dropped)
+
+    def flush(self) -> None:
+        if not self.pending or not self.transport:
+            return
+        # the pending sentences always fit one datagram, send() flushes before the budget is exceeded
+        data, count = b''.join(self.pending), len(self.pending)
+        self.pending = []
+        self.pending_bytes = 0
+        self.write(data, count)
+
+    def write(self, data: bytes, count: int) -> None:
+        if self.transport.get_write_buffer_size() > self.max_buffer:
+            self.dropped += count
+            return
+        try:
+            for target in self.targets:
+                self.transport.sendto(data, target)
+            self.sent += count
+            self.datagrams += 1
+        except OSError as e:
+            self.dropped += count
+            logger.error(f"Error sending UDP datagram: {e}")
@@ -1,19 +1,62 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TimestampAdjuster:
-    def __init__(self):
-        self.start_time = datetime.now()
+    OUTPUTS = ('datetime', 'float', 'int')
+
+    def __init__(self, start_time: Optional[datetime] = None, date_cache_size: int = 64):
+        self.start_time = start_time or datetime.now()
         self.base_epoch = datetime(1970, 1, 1)
-    
+        self.start_epoch_us = round(self.start_time.timestamp() * 1_000_000)
+        self.date_cache_size = date_cache_size
+        # SBS date string -> whole days since base_epoch
+        self.dates: Dict[str, int] = {}
+
     def adjust(self, str_timestamp: str) -> datetime:
-        try:
-            timestamp = datetime.strptime(str_timestamp, "%Y/%m/%d %H:%M:%S.%f")
-            delta = timestamp - self.base_epoch
-            adjusted_time = self.start_time + delta
-            return adjusted_time
-        except Exception as e:
-            logger.error(f"Error ajusting timestamp: {e}")
-            return self.start_time
\ No newline at end of file
+        date, _, time = str_timestamp.partition(' ')
+        return self.adjust_parts(date, time)
+
+    def adjust_parts(self, date: str, time: str, output: str = 'datetime') -> Union[datetime, float, int]:
+        offset = self.offset_us(date, time)
+        if offset is None:
+            try:
+                offset = self.slow_offset_us(f"{date} {time}")
+            except Exception as e:
+                logger.error(f"Error ajusting timestamp: {e}")
+                offset = 0
+
+        if output == 'datetime':
+            return self.start_time + timedelta(microseconds=offset)
+        if output == 'float':
+            return (self.start_epoch_us + offset) / 1_000_000
+        if output == 'int':
+            return (self.start_epoch_us + offset) // 1000
+        raise ValueError(f"Unknown output {output}, expected one of {self.OUTPUTS}")
+
+    def offset_us(self, date: str, time: str) -> Optional[int]:
+        # fast path for the fixed width HH:MM:SS.fff field, None falls back to strptime
+        days = self.dates.get(date)
+        if days is None:
+            try:
+                days = (datetime.strptime(date, "%Y/%m/%d") - self.base_epoch).days
+            except ValueError:
+                return None
+            if len(self.dates) >= self.date_cache_size:
+                self.dates.clear()
+            self.dates[date] = days
+
+        hh, mm, ss, fraction = time[0:2], time[3:5], time[6:8], time[9:]
+        if (len(time) < 10 or len(time) > 15 or time[2] != ':' or time[5] != ':' or time[8] != '.'
+                or not (hh.isdecimal() and mm.isdecimal() and ss.isdecimal() and fraction.isdecimal())):
+            return None
+        hours, minutes, seconds = int(hh), int(mm), int(ss)
+        if hours > 23 or minutes > 59 or seconds > 59:
+            return None
+        return (days * 86400 + hours * 3600 + minutes * 60 + seconds) * 1_000_000 + int(fraction.ljust(6, '0'))
+
+    def slow_offset_us(self, str_timestamp: str) -> int:
+        delta = datetime.strptime(str_timestamp, "%Y/%m/%d %H:%M:%S.%f") - self.base_epoch
+        return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
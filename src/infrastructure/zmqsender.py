@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional, Tuple
+from src.domain.ports import ISender
+from src.infrastructure.adapters import decode_mmsi
+from src.infrastructure.metrics import MetricsRegistry
+import zmq
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ZmqAISMessageSender(ISender):
+    SOCKET_TYPES = {'pub': zmq.PUB, 'push': zmq.PUSH}
+
+    def __init__(self, endpoint: str = 'tcp://127.0.0.1:4003', socket_type: str = 'pub', sndhwm: int = 10000, linger: int = 0,
+                 batch_size: int = 64, batch_interval: float = 0.005):
+        if socket_type not in self.SOCKET_TYPES:
+            raise ValueError(f"Unknown ZeroMQ socket type {socket_type}, expected one of {tuple(self.SOCKET_TYPES)}")
+        self.endpoint = endpoint
+        self.socket_type = socket_type
+        self.sndhwm = sndhwm
+        self.linger = linger
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.context: Optional[zmq.Context] = None
+        self.socket: Optional[zmq.Socket] = None
+        self.pending: List[Tuple[Optional[int], bytes]] = []
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        logger.info(f"Initialized ZmqAISMessageSender with endpoint: {endpoint}, socket_type: {socket_type}, sndhwm: {sndhwm}, batch_size: {batch_size}")
+
+    async def start(self) -> None:
+        self.context = zmq.Context.instance()
+        self.socket = self.context.socket(self.SOCKET_TYPES[self.socket_type])
+        self.socket.setsockopt(zmq.SNDHWM, self.sndhwm)
+        self.socket.setsockopt(zmq.LINGER, self.linger)
+        self.socket.bind(self.endpoint)
+        logger.info(f"Started ZmqAISMessageSender on {self.endpoint}")
+
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            if self.batch_interval > 0:
+                await asyncio.sleep(self.batch_interval)
+            self.flush()
+
+    async def stop(self) -> None:
+        if self.socket:
+            self.flush()
+            self.socket.close()
+            self.socket = None
+        logger.info(f"Stopped ZmqAISMessageSender, sent: {self.sent}, dropped: {self.dropped}")
+
+    async def send(self, message: str) -> None:
+        if not self.socket:
+            return
+        self.pending.append((decode_mmsi(message), message.encode('utf-8')))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        else:
+            self.ready.set()
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        labels = {'endpoint': self.endpoint}
+        registry.counter_func('ais_sender_zmq_sent_total', 'Sentences handed to libzmq', lambda: self.sent, labels)
+        registry.counter_func('ais_sender_zmq_dropped_total', 'Sentences dropped at the high-water mark', lambda: self.dropped, labels)
+        registry.gauge('ais_sender_zmq_pending', 'Sentences waiting for the next flush', labels, lambda: len(self.pending))
+
+    def flush(self) -> None:
+        if not self.pending or not self.socket:
+            return
+        pending, self.pending = self.pending, []
+
+        if self.socket_type == 'push':
+            self.send_frames([data for _, data in pending], len(pending))
+            return
+
+        # subscribers filter on the first frame, so each multipart carries one mmsi
+        topics: Dict[Optional[int], List[bytes]] = {}
+        for mmsi, data in pending:
+            topics.setdefault(mmsi, []).append(data)
+        for mmsi, sentences in topics.items():
+            topic = f'{mmsi:09d}'.encode('ascii') if mmsi is not None else b''
+            self.send_frames([topic, *sentences], len(sentences))
+
+    def send_frames(self, frames: List[bytes], count: int) -> None:
+        try:
+            self.socket.send_multipart(frames, flags=zmq.NOBLOCK)
+            self.sent += count
+        except zmq.Again:
+            self.dropped += count
+        except zmq.ZMQError as e:
+            self.dropped += count
+            logger.error(f"Error publishing on {self.endpoint}: {e}")
@@ -1,35 +1,286 @@
 from src.domain.models import Aircraft
 from src.application.usecases import ConvertAircraftToAISTrame
+from src.application.scheduler import EmissionScheduler
+from src.application.cache import TrameCache
+from src.application.pipeline import StagedPipeline
 from src.infrastructure.settings import SettingsReader
-from src.infrastructure.adapters import TCPADSReceiver, TCPAISMessageSender, AisMessageBuilder
+from src.infrastructure.adapters import TCPADSReceiver, MultiFeedReceiver, TCPAISMessageSender, MultiSender, AisMessageBuilder, ClientQueue
+from src.infrastructure.zmqsender import ZmqAISMessageSender
+from src.infrastructure.udpsender import UDPAISMessageSender
 from src.infrastructure.utils import TimestampAdjuster
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.sbs import SBSParser
+from src.infrastructure.modes import ModeSReceiver
+from src.infrastructure.sharding import ShardedPipeline
+from src.infrastructure.metrics import MetricsRegistry
+from src.infrastructure.httpserver import HTTPEndpoint
+from src.infrastructure.logconfig import LogSampler
+from src.infrastructure.tracklog import TrackLogWriter, restore
+from src.infrastructure.profiling import ProfilingHooks
+from src.infrastructure.snapshot import TrafficSnapshot
+from typing import Sequence
 import logging
 import asyncio
+import time
 
 class Application:
-    def __init__(self):
+    def __init__(self, settings: dict | None = None):
         self.adjuster = TimestampAdjuster()
-        self.settings = SettingsReader().settings
-        self.receiver = TCPADSReceiver(self.settings['ads_receiver_tcp']['host'], self.settings['ads_receiver_tcp']['port'], adjuster=self.adjuster)
-        self.sender = TCPAISMessageSender(self.settings['ais_sender_tcp']['host'], self.settings['ais_sender_tcp']['port'])
+        self.settings = settings if settings is not None else SettingsReader().settings
+        receiver_settings = self.settings['ads_receiver_tcp']
+        logging_settings = self.settings.get('logging', {})
+        production = logging_settings.get('mode', 'debug') == 'production'
+        # per-message log lines are limited to one per ICAO every sample_interval in production mode only
+        self.sample_interval = float(logging_settings.get('sample_interval', 10.0)) if production else 0.0
+        self.store = AircraftStore(
+            ttl=self.settings.get('aircraft_store', {}).get('ttl', 300.0),
+            max_size=self.settings.get('aircraft_store', {}).get('max_size', 10000),
+            dedup_window=receiver_settings.get('dedup_window', 0.2) if receiver_settings.get('feeds') else None
+        )
+        self.track_log: TrackLogWriter | None = None
+        track_settings = self.settings.get('track_log', {})
+        if track_settings.get('enabled', False):
+            path = track_settings.get('path', 'data/track.log')
+            restore(path, self.store, track_settings.get('max_age', 300.0))
+            self.track_log = TrackLogWriter(
+                path,
+                flush_interval=track_settings.get('flush_interval', 1.0),
+                max_bytes=track_settings.get('max_bytes', 256 * 1024 * 1024)
+            )
+            self.store.listeners.append(self.track_log.append)
+        modes_settings = self.settings.get('ads_receiver_modes', {})
+        if modes_settings.get('enabled', False):
+            self.receiver = ModeSReceiver(
+                modes_settings['host'],
+                modes_settings['port'],
+                format=modes_settings.get('format', 'beast'),
+                reconnect_delay=modes_settings.get('reconnect_delay', 5.0),
+                store=self.store,
+                reference=modes_settings.get('reference')
+            )
+        elif receiver_settings.get('feeds'):
+            self.receiver = MultiFeedReceiver(
+                receiver_settings['feeds'],
+                adjuster=self.adjuster,
+                store=self.store,
+                reconnect_delay=receiver_settings.get('reconnect_delay', 5.0),
+                log_sampler=LogSampler(self.sample_interval)
+            )
+        else:
+            self.receiver = TCPADSReceiver(receiver_settings['host'], receiver_settings['port'], adjuster=self.adjuster, store=self.store,
+                                           log_sampler=LogSampler(self.sample_interval))
+        self.senders = [TCPAISMessageSender(
+            self.settings['ais_sender_tcp']['host'],
+            self.settings['ais_sender_tcp']['port'],
+            queue_size=self.settings['ais_sender_tcp'].get('queue_size', 1024),
+            overflow_policy=self.settings['ais_sender_tcp'].get('overflow_policy', 'drop_oldest'),
+            batch_window=self.settings['ais_sender_tcp'].get('batch_window', 0.0),
+            batch_bytes=self.settings['ais_sender_tcp'].get('batch_bytes', 65536),
+            cell_size=self.settings['ais_sender_tcp'].get('cell_size', 1.0)
+        )]
+        zmq_settings = self.settings.get('ais_sender_zmq', {})
+        if zmq_settings.get('enabled', False):
+            self.senders.append(ZmqAISMessageSender(
+                zmq_settings.get('endpoint', 'tcp://127.0.0.1:4003'),
+                socket_type=zmq_settings.get('socket_type', 'pub'),
+                sndhwm=zmq_settings.get('sndhwm', 10000),
+                linger=zmq_settings.get('linger', 0),
+                batch_size=zmq_settings.get('batch_size', 64),
+                batch_interval=zmq_settings.get('batch_interval', 0.005)
+            ))
+        udp_settings = self.settings.get('ais_sender_udp', {})
+        if udp_settings.get('enabled', False):
+            self.senders.append(UDPAISMessageSender(
+                udp_settings.get('targets', ['127.0.0.1:10110']),
+                ttl=udp_settings.get('ttl', 1),
+                unicast_ttl=udp_settings.get('unicast_ttl'),
+                interface=udp_settings.get('interface'),
+                loopback=udp_settings.get('loopback', True),
+                max_datagram=udp_settings.get('max_datagram', 1472),
+                batch_interval=udp_settings.get('batch_interval', 0.0)
+            ))
+        self.sender = self.senders[0] if len(self.senders) == 1 else MultiSender(self.senders)
         self.builder = AisMessageBuilder()
-        self.usecase = ConvertAircraftToAISTrame(self.sender)
+        self.cache: TrameCache | None = None
+        cache_settings = self.settings.get('trame_cache', {})
+        if cache_settings.get('enabled', False):
+            self.cache = TrameCache(
+                refresh_interval=cache_settings.get('refresh_interval', 30.0),
+                max_size=cache_settings.get('max_size', 10000),
+                ttl=cache_settings.get('ttl', 300.0)
+            )
+        pipeline_settings = self.settings.get('pipeline', {})
+        self.staged: StagedPipeline | None = None
+        if pipeline_settings.get('mode', 'inline') == 'staged':
+            staged_settings = pipeline_settings.get('staged', {})
+            self.staged = StagedPipeline(
+                self.encode_batch,
+                self.sender,
+                encode_queue_size=staged_settings.get('encode_queue_size', 10000),
+                encode_workers=staged_settings.get('encode_workers', 1),
+                encode_batch=staged_settings.get('encode_batch', 64),
+                broadcast_queue_size=staged_settings.get('broadcast_queue_size', 10000),
+                broadcast_workers=staged_settings.get('broadcast_workers', 1),
+                broadcast_batch=staged_settings.get('broadcast_batch', 256)
+            )
+        # in staged mode the usecase hands its sentences to the broadcast stage
+        self.usecase = ConvertAircraftToAISTrame(self.staged or self.sender, log_sampler=LogSampler(self.sample_interval), cache=self.cache)
+        self.log_sampler = LogSampler(self.sample_interval)
+        self.summary_interval = logging_settings.get('summary_interval', 30.0) if production else 0.0
+        self.scheduler: EmissionScheduler | None = None
+        scheduler_settings = self.settings.get('scheduler', {})
+        if scheduler_settings.get('enabled', False):
+            self.scheduler = EmissionScheduler(
+                self.emit,
+                interval=scheduler_settings.get('interval', 10.0),
+                speed_intervals=scheduler_settings.get('speed_intervals')
+            )
+        self.pipeline: ShardedPipeline | None = None
+        if pipeline_settings.get('mode', 'inline') == 'sharded':
+            self.pipeline = ShardedPipeline(
+                receiver_settings['host'],
+                receiver_settings['port'],
+                self.sender,
+                workers=pipeline_settings.get('workers'),
+                start_time=self.adjuster.start_time,
+                reconnect_delay=receiver_settings.get('reconnect_delay', 5.0),
+                ttl=self.store.ttl,
+                max_size=self.store.max_size
+            )
+        self.snapshot: TrafficSnapshot | None = None
+        snapshot_settings = self.settings.get('traffic_snapshot', {})
+        if snapshot_settings.get('enabled', False):
+            if self.pipeline:
+                logging.getLogger(__name__).warning(f"Traffic snapshot only sees the inline store, sharded workers keep their own")
+            self.snapshot = TrafficSnapshot(
+                capacity=snapshot_settings.get('capacity', 1024),
+                max_results=snapshot_settings.get('max_results', 10000)
+            )
+            self.snapshot.attach(self.store)
+        self.metrics: MetricsRegistry | None = None
+        self.http: HTTPEndpoint | None = None
+        metrics_settings = self.settings.get('metrics', {})
+        if metrics_settings.get('enabled', False):
+            self.metrics = MetricsRegistry()
+            self.register_metrics(self.metrics)
+            self.http = HTTPEndpoint(metrics_settings.get('host', '127.0.0.1'), metrics_settings.get('port', 9108))
+            self.http.route(metrics_settings.get('path', '/metrics'), self.render_metrics)
+        if self.snapshot is not None:
+            # served next to /metrics when both are enabled
+            if self.http is None:
+                self.http = HTTPEndpoint(snapshot_settings.get('host', '127.0.0.1'), snapshot_settings.get('port', 9108))
+            self.http.route(snapshot_settings.get('path', '/traffic'), self.snapshot.query)
+        self.profiling: ProfilingHooks | None = None
+        profiling_settings = self.settings.get('profiling', {})
+        if profiling_settings.get('enabled', False):
+            tcp_sender = self.senders[0]
+            self.profiling = ProfilingHooks(
+                profiling_settings.get('output_dir', 'profiles'),
+                sample_interval=profiling_settings.get('sample_interval', 0.005),
+                lag_interval=profiling_settings.get('lag_interval', 0.1),
+                slow_callback=profiling_settings.get('slow_callback', 0.05),
+                tracemalloc_frames=profiling_settings.get('tracemalloc_frames', 10),
+                components={'aircraft_store': self.store.memory_usage, 'sender_client_buffers': tcp_sender.memory_usage},
+                sites={'aircraft_store': [AircraftStore], 'sbs_parser': [SBSParser],
+                       'sender_client_buffers': [ClientQueue.put, ClientQueue.take, TCPAISMessageSender.send]}
+            )
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"Initialized Application")
 
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        self.store.register_metrics(registry)
+        self.usecase.encode_time = registry.histogram('ais_encode_seconds', 'Time to encode one AIS type 9 trame')
+        for component in (self.receiver, self.sender, self.pipeline, self.snapshot):
+            if component is not None and hasattr(component, 'register_metrics'):
+                component.register_metrics(registry)
+        if self.scheduler:
+            registry.gauge('scheduler_pending', 'Aircraft with an update waiting for their next emission slot', func=lambda: len(self.scheduler.pending))
+            registry.counter_func('scheduler_emitted_total', 'Aircraft states emitted by the scheduler', lambda: self.scheduler.emitted)
+        if self.staged:
+            for stage, queue in (('encode', self.staged.encode_queue), ('broadcast', self.staged.broadcast_queue)):
+                registry.gauge('staged_pipeline_queue_depth', 'Items waiting for a pipeline stage', {'stage': stage}, func=queue.qsize)
+            registry.counter_func('staged_pipeline_shed_total', 'Items dropped by a full stage queue', lambda: self.staged.encode_shed, {'stage': 'encode'})
+            registry.counter_func('staged_pipeline_shed_total', 'Items dropped by a full stage queue', lambda: self.staged.broadcast_shed, {'stage': 'broadcast'})
+            registry.counter_func('staged_pipeline_coalesced_total', 'Aircraft states replaced by a newer one while queued for encoding', lambda: self.staged.coalesced)
+        if self.cache is not None:
+            registry.gauge('trame_cache_entries', 'MMSIs with a cached AIS sentence', func=lambda: len(self.cache))
+            registry.counter_func('trame_cache_hits_total', 'States unchanged at AIS resolution, encoding skipped', lambda: self.cache.hits)
+            registry.counter_func('trame_cache_misses_total', 'States encoded because they changed or were not cached', lambda: self.cache.misses)
+            registry.counter_func('trame_cache_suppressed_total', 'Unchanged states not sent within the refresh interval', lambda: self.cache.suppressed)
+            registry.counter_func('trame_cache_evicted_total', 'Cache entries dropped for max_size or ttl', lambda: self.cache.evicted + self.cache.expired)
+
+    def render_metrics(self, query: dict) -> tuple:
+        return 200, 'text/plain; version=0.0.4; charset=utf-8', self.metrics.render().encode('utf-8')
+
     def stop(self) -> None:
+        if self.pipeline:
+            self.pipeline.stop()
         self.receiver.stop()
+        self.store.stop()
+        if self.scheduler:
+            self.scheduler.stop()
+        if self.staged:
+            self.staged.stop()
+        if self.track_log:
+            self.track_log.stop()
+        if self.cache is not None:
+            self.logger.info(f"Trame cache: {self.cache.stats()}")
         self.sender.stop()
         self.logger.info(f"Application stopped")
 
     async def callback(self, aircraft: Aircraft) -> None:
-        self.logger.info(f"Received aircraft: {aircraft}")
-        await self.usecase.execute(aircraft, self.builder)
+        if self.logger.isEnabledFor(logging.INFO) and self.log_sampler.allow(aircraft.icao):
+            self.logger.info("Received aircraft: %s", aircraft)
+        if self.scheduler:
+            self.scheduler.update(aircraft)
+        else:
+            await self.emit(aircraft)
+
+    async def emit(self, aircraft: Aircraft) -> None:
+        if self.staged:
+            self.staged.submit(aircraft)
+        else:
+            await self.usecase.execute(aircraft, self.builder)
+
+    async def encode_batch(self, aircrafts: Sequence[Aircraft]) -> None:
+        await self.usecase.execute_batch(aircrafts, self.builder)
+
+    async def summarize(self) -> None:
+        # periodic totals instead of one line per message in production logging mode
+        last_sent, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(self.summary_interval)
+            sent = self.pipeline.sentences if self.pipeline else self.usecase.sent
+            now = time.monotonic()
+            stats = self.store.stats()
+            samplers = [self.log_sampler, self.usecase.log_sampler, getattr(self.receiver, 'log_sampler', None)]
+            suppressed = sum(sampler.suppressed for sampler in samplers if sampler is not None)
+            self.logger.info(
+                "Summary: aircraft live %d, store updates %d, sentences sent %d (%.1f/s), suppressed log lines %d",
+                stats['live'], stats['inserted'] + stats['updated'], sent, (sent - last_sent) / (now - last_time), suppressed
+            )
+            last_sent, last_time = sent, now
 
     async def run(self) -> None:
-        self.receiver.register_callback(self.callback)
-        self.receiver.start()
+        if self.profiling:
+            self.profiling.install(asyncio.get_running_loop())
+        if self.track_log:
+            self.track_log.start()
+        self.store.start()
+        if self.pipeline:
+            self.pipeline.start()
+        else:
+            self.receiver.register_callback(self.callback)
+            if self.staged:
+                self.staged.start()
+            if self.scheduler:
+                self.scheduler.start()
+            self.receiver.start()
         asyncio.create_task(self.sender.start())
+        if self.http:
+            asyncio.create_task(self.http.start())
+        if self.summary_interval > 0:
+            asyncio.create_task(self.summarize())
         self.logger.info(f"Application started")
         await asyncio.Future()
 
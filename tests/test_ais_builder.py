@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from src.domain.models import Aircraft
+from src.infrastructure.adapters import AisMessageBuilder
+import asyncio
+import random
+import pytest
+
+builder = AisMessageBuilder()
+
+def reference(aircraft: Aircraft) -> str:
+    # the original bit string encoder, kept as the byte for byte reference for the packed and batch paths
+    bits = ''
+    bits += builder.to_bits(9, 6)                                                        # message type
+    bits += builder.to_bits(0, 2)                                                        # repeat
+    bits += builder.to_bits(int(aircraft.icao[:6], 16), 30)                              # mmsi
+    bits += builder.to_bits(int(round(aircraft.altitude * 0.3048)), 12)                  # altitude
+    bits += builder.to_bits(int(aircraft.speed), 10)                                     # sog
+    bits += builder.to_bits(1, 1)                                                        # position accuracy
+    bits += builder.to_bits(builder.deg_to_ais_lon(aircraft.longitude), 28, signed=True) # longitude
+    bits += builder.to_bits(builder.deg_to_ais_lat(aircraft.latitude), 27, signed=True)  # latitude
+    bits += builder.to_bits(int(round(aircraft.heading * 10)) % 4096, 12)                # cog
+    bits += builder.to_bits(aircraft.timestamp.astimezone(timezone.utc).second, 6)       # timestamp utc
+    bits += builder.to_bits(0, 8)                                                        # regional
+    bits += builder.to_bits(0, 1)                                                        # dte
+    bits += builder.to_bits(0, 3)                                                        # spare
+    bits += builder.to_bits(0, 1)                                                        # assigned
+    bits += builder.to_bits(0, 1)                                                        # raim
+    bits += builder.to_bits(0, 20)                                                       # radio status
+    payload, pad = builder.sixbit_encode(bits)
+    body = f'AIVDM,1,1,,A,{payload},{pad}'
+    return f'!{body}*{builder.nmea_checksum(body)}'
+
+def random_aircraft(rng: random.Random) -> Aircraft:
+    return Aircraft(
+        icao=f'{rng.randrange(1 << 24):06X}',
+        callsign='TEST',
+        altitude=rng.choice([rng.randrange(0, 60000), rng.uniform(0, 60000)]),
+        latitude=rng.uniform(-90, 90),
+        longitude=rng.uniform(-180, 180),
+        heading=rng.choice([rng.uniform(0, 360), round(rng.uniform(0, 360), 2)]),
+        speed=rng.choice([rng.randrange(0, 1200), rng.uniform(0, 1200)]),
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.uniform(0, 86400))
+    )
+
+EDGE_CASES = [
+    Aircraft(icao='000000', callsign='A', altitude=0, latitude=0.0, longitude=0.0, heading=0, speed=0),
+    Aircraft(icao='FFFFFF', callsign='A', altitude=0, latitude=-89.99999, longitude=-179.99999, heading=360, speed=1023),
+    Aircraft(icao='A1B2C3', callsign='A', altitude=45000, latitude=-33.94, longitude=-151.17, heading=359.95, speed=1024),
+    Aircraft(icao='4CA7B5', callsign='A', altitude=1, latitude=90, longitude=180, heading=359.94, speed=5000.7),
+    Aircraft(icao='E80261', callsign='A', altitude=0.5, latitude=-12.02737, longitude=-77.12279, heading=0.05, speed=0.99),
+    Aircraft(icao='3C6DD2', callsign='A', altitude=13435, latitude=-0.0000008, longitude=-0.0000008, heading=0.04, speed=1022.99),
+]
+
+def cases():
+    rng = random.Random(20240101)
+    return EDGE_CASES + [random_aircraft(rng) for _ in range(5000)]
+
+@pytest.mark.parametrize('aircraft', EDGE_CASES, ids=lambda aircraft: aircraft.icao)
+def test_trame_matches_reference_edge_cases(aircraft):
+    trame = asyncio.run(builder.build_ais_type9_trame(aircraft))
+    assert trame.nmea_message == reference(aircraft)
+
+def test_trame_matches_reference_random():
+    async def encode_all(aircrafts):
+        return [(await builder.build_ais_type9_trame(aircraft)).nmea_message for aircraft in aircrafts]
+
+    aircrafts = cases()
+    assert asyncio.run(encode_all(aircrafts)) == [reference(aircraft) for aircraft in aircrafts]
+
+def test_batch_matches_reference():
+    aircrafts = cases()
+    assert [trame.nmea_message for trame in builder.build_ais_type9_batch(aircrafts)] == [reference(aircraft) for aircraft in aircrafts]
+
+@pytest.mark.parametrize('size', [0, 1, 2, 6])
+def test_batch_sizes(size):
+    aircrafts = EDGE_CASES[:size]
+    assert [trame.nmea_message for trame in builder.build_ais_type9_batch(aircrafts)] == [reference(aircraft) for aircraft in aircrafts]
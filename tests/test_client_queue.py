@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from typing import List
+from src.domain.models import Aircraft
+from src.infrastructure.adapters import AisMessageBuilder, ClientQueue, TCPAISMessageSender
+import asyncio
+import pytest
+
+class FakeWriter:
+    def __init__(self, peer=('127.0.0.1', 40000)):
+        self.peer = peer
+        self.transport = None
+        self.closed = False
+        self.written: List[bytes] = []
+
+    def get_extra_info(self, name: str):
+        return self.peer if name == 'peername' else None
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def writelines(self, data: List[bytes]) -> None:
+        self.written += data
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        await asyncio.sleep(0)
+
+def sentence(icao: str) -> str:
+    aircraft = Aircraft(icao=icao, callsign='TEST', altitude=10000, latitude=48.5, longitude=2.25, heading=90, speed=400,
+                        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    return AisMessageBuilder().encode_type9(aircraft)
+
+def drain(queue: ClientQueue) -> List[bytes]:
+    batch: List[bytes] = []
+    queue.take(batch, 0, 1 << 30)
+    return batch
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        ClientQueue(FakeWriter(), policy='drop_all')
+    with pytest.raises(ValueError):
+        TCPAISMessageSender(overflow_policy='drop_all')
+
+def test_drop_oldest():
+    queue = ClientQueue(FakeWriter(), maxsize=3, policy='drop_oldest')
+    for i in range(5):
+        assert queue.put(b'%d' % i)
+    assert drain(queue) == [b'2', b'3', b'4']
+    assert queue.dropped == 2
+
+def test_drop_newest():
+    queue = ClientQueue(FakeWriter(), maxsize=3, policy='drop_newest')
+    for i in range(5):
+        assert queue.put(b'%d' % i)
+    assert drain(queue) == [b'0', b'1', b'2']
+    assert queue.dropped == 2
+    assert not queue.overflowed
+
+def test_disconnect():
+    queue = ClientQueue(FakeWriter(), maxsize=3, policy='disconnect')
+    assert all(queue.put(b'%d' % i) for i in range(3))
+    assert not queue.put(b'3')
+    assert queue.overflowed
+    assert queue.dropped == 1
+    assert drain(queue) == [b'0', b'1', b'2']
+
+def test_latest_per_mmsi():
+    queue = ClientQueue(FakeWriter(), maxsize=3, policy='latest_per_mmsi')
+    # a newer sentence replaces the queued one of its MMSI in place
+    for data, mmsi in [(b'a1', 1), (b'b1', 2), (b'a2', 1), (b'c1', 3)]:
+        assert queue.put(data, mmsi)
+    assert len(queue) == 3
+    assert queue.dropped == 1
+    # a new MMSI on a full queue evicts the oldest MMSI
+    assert queue.put(b'd1', 4)
+    assert queue.dropped == 2
+    assert drain(queue) == [b'b1', b'c1', b'd1']
+
+def test_get_and_get_batch():
+    async def run():
+        queue = ClientQueue(FakeWriter(), maxsize=10)
+        waiter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        queue.put(b'first')
+        assert await waiter == b'first'
+        for i in range(4):
+            queue.put(b'%d' % i)
+        assert await queue.get_batch(0.0, 2) == [b'0', b'1']
+        assert await queue.get_batch(0.0, 1 << 20) == [b'2', b'3']
+
+    asyncio.run(run())
+
+@pytest.mark.parametrize('policy', ClientQueue.POLICIES)
+def test_sender_overflow(policy):
+    async def run():
+        sender = TCPAISMessageSender(queue_size=3, overflow_policy=policy)
+        writer = FakeWriter()
+        client = ClientQueue(writer, sender.queue_size, policy)
+        sender.clients[writer] = client
+        messages = [sentence(icao) for icao in ('4CA7B5', '3C6DD2', 'A1B2C3', '4CA7B5')]
+        for message in messages:
+            await sender.send(message)
+        if policy != 'disconnect':
+            assert sender.clients == {writer: client}
+            assert not sender.tasks
+            return [data.decode('utf-8').strip() for data in drain(client)], messages
+        # the disconnect runs as a task the sender keeps until it finishes
+        assert writer not in sender.clients
+        assert len(sender.tasks) == 1
+        await asyncio.gather(*sender.tasks)
+        assert writer.closed
+        assert not sender.tasks
+        return None, messages
+
+    queued, messages = asyncio.run(run())
+    expected = {
+        'drop_oldest': messages[1:],
+        'drop_newest': messages[:3],
+        'latest_per_mmsi': [messages[3], messages[1], messages[2]],
+        'disconnect': None,
+    }
+    assert queued == expected[policy]
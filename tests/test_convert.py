@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import List
+from benchmarks.e2e import bench_settings
+from convert import convert
+from src.infrastructure.utils import TimestampAdjuster
+from src.presentation.app import Application
+import asyncio
+import io
+import pytest
+
+DATA_FILE = 'data/ads_data.log'
+START_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+class Collector:
+    def __init__(self):
+        self.sentences: List[bytes] = []
+
+    async def send(self, message: str) -> None:
+        self.sentences.append(f'{message}\n'.encode('ascii'))
+
+def live_inline() -> bytes:
+    # the receiver -> store -> callback -> encode path of Application in inline mode, without the sockets
+    app = Application(bench_settings(14901, 14902, scheduler=False, trame_cache=False))
+    app.receiver.parser.adjuster = TimestampAdjuster(START_TIME)
+    collector = Collector()
+    app.usecase.sender = collector
+
+    async def run() -> None:
+        parser = app.receiver.parser
+        with open(DATA_FILE, 'rb') as f:
+            for line in parser.split(f.read()) + [parser.remainder]:
+                aircraft = parser.parse_line(line.strip())
+                if aircraft is not None and aircraft.valid():
+                    await app.callback(aircraft)
+
+    asyncio.run(run())
+    return b''.join(collector.sentences)
+
+def converted(workers: int, block_size: int = 16 * 1024 * 1024) -> bytes:
+    output = io.BytesIO()
+    count = convert(DATA_FILE, output, START_TIME, workers=workers, block_size=block_size)
+    assert count == output.getvalue().count(b'\n')
+    return output.getvalue()
+
+@pytest.fixture(scope='module')
+def expected() -> bytes:
+    return live_inline()
+
+def test_convert_matches_live_inline_path(expected):
+    assert expected.count(b'\n') > 1000
+    assert converted(1) == expected
+
+def test_small_blocks_match(expected):
+    assert converted(1, block_size=4096) == expected
+
+def test_workers_match_single_process(expected):
+    assert converted(4, block_size=16384) == expected
@@ -0,0 +1,55 @@
+from benchmarks.e2e import bench_settings
+from src.infrastructure.logconfig import LogSampler, configure_logging, stop_logging
+from src.presentation.app import Application
+import io
+import logging
+
+def samplers(app: Application) -> list:
+    return [app.log_sampler, app.usecase.log_sampler, app.receiver.log_sampler]
+
+def test_sampler_interval_is_per_instance():
+    quiet, verbose = LogSampler(60.0), LogSampler()
+    assert quiet.allow('4CA7B5')
+    assert not quiet.allow('4CA7B5')
+    assert quiet.allow('3C6DD2')
+    assert quiet.suppressed == 1
+    assert all(verbose.allow('4CA7B5') for _ in range(3))
+    assert verbose.suppressed == 0
+
+def test_sampler_bounds_keys():
+    sampler = LogSampler(60.0, max_keys=2)
+    for key in ('a', 'b', 'c'):
+        assert sampler.allow(key)
+    assert len(sampler.last) <= 2
+
+def test_application_samplers_follow_logging_settings():
+    settings = bench_settings(14911, 14912, scheduler=False)
+    settings['logging'] = {'mode': 'production', 'sample_interval': 2.5}
+    assert [sampler.interval for sampler in samplers(Application(settings))] == [2.5, 2.5, 2.5]
+    settings['logging'] = {'mode': 'debug', 'sample_interval': 2.5}
+    assert [sampler.interval for sampler in samplers(Application(settings))] == [0.0, 0.0, 0.0]
+
+def test_feeds_share_one_sampler():
+    settings = bench_settings(14911, 14912, scheduler=False, logging_mode='production')
+    settings['ads_receiver_tcp']['feeds'] = [{'host': '127.0.0.1', 'port': 14913}, {'host': '127.0.0.1', 'port': 14914}]
+    app = Application(settings)
+    assert all(receiver.log_sampler is app.receiver.log_sampler for receiver in app.receiver.receivers)
+    assert app.receiver.log_sampler.interval == 10.0
+
+def test_configure_logging_leaves_samplers_alone():
+    sampler = LogSampler(5.0)
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    try:
+        configure_logging({'mode': 'production', 'sample_interval': 1.0}, stream=io.StringIO())
+        assert sampler.interval == 5.0
+        assert LogSampler().interval == 0.0
+        configure_logging({'mode': 'debug'}, stream=io.StringIO())
+        assert sampler.interval == 5.0
+    finally:
+        stop_logging()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
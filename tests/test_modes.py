@@ -0,0 +1,148 @@
+from typing import List
+from ads_server import TCPADSSender
+from src.infrastructure.modes import BeastFramer, ModeSDecoder, ModeSReceiver, RawFramer
+from src.infrastructure.store import AircraftStore
+import asyncio
+import pytest
+
+IDENTIFICATION = '8D406B902015A678D4D220AA4BDA'  # 406B90 EZY85MH
+POSITION_EVEN = '8D40621D58C382D690C8AC2863A7'   # 40621D 38000 ft, with the odd frame 52.2572, 3.9194
+POSITION_ODD = '8D40621D58C386435CC412692AD6'
+VELOCITY = '8D485020994409940838175B284F'        # 485020 159 kt, 182.88 degrees
+VECTORS = [IDENTIFICATION, POSITION_ODD, POSITION_EVEN, VELOCITY]
+
+def beast(message: str, mlat: bytes = b'\x00\x01\x02\x03\x04\x05', signal: int = 0x80, kind: int = 0x33) -> bytes:
+    # type byte, 6 byte MLAT timestamp, signal level and message, 0x1a doubled inside the frame
+    body = mlat + bytes([signal]) + bytes.fromhex(message)
+    return bytes([0x1a, kind]) + body.replace(b'\x1a', b'\x1a\x1a')
+
+def decode_all(frames: List[bytes]) -> AircraftStore:
+    store = AircraftStore()
+    decoder = ModeSDecoder(store)
+    for now, frame in enumerate(frames):
+        decoder.decode(frame, float(now))
+    return store
+
+def check_store(store: AircraftStore, position_tolerance: float = 1e-4) -> None:
+    assert store.get('406B90').callsign == 'EZY85MH'
+    aircraft = store.get('40621D')
+    assert aircraft.altitude == 38000
+    assert aircraft.latitude == pytest.approx(52.2572, abs=position_tolerance)
+    assert aircraft.longitude == pytest.approx(3.9194, abs=position_tolerance)
+    aircraft = store.get('485020')
+    assert aircraft.speed == 159
+    assert aircraft.heading == pytest.approx(182.88, abs=0.01)
+
+def test_decoder_known_vectors():
+    # the even frame arrives last, so the global decode uses its zone like the reference example
+    check_store(decode_all([bytes.fromhex(message) for message in VECTORS]))
+
+def test_decoder_rejects_bad_crc_and_other_formats():
+    store = AircraftStore()
+    decoder = ModeSDecoder(store)
+    corrupted = bytearray.fromhex(IDENTIFICATION)
+    corrupted[5] ^= 0x01
+    assert decoder.decode(bytes(corrupted)) is None
+    assert decoder.rejected == 1
+    assert decoder.decode(bytes.fromhex('5D406B90D2C3B6')) is None
+    assert len(store) == 0
+
+def test_decoder_local_decode_after_global():
+    store = AircraftStore()
+    decoder = ModeSDecoder(store)
+    decoder.decode(bytes.fromhex(POSITION_ODD), 0.0)
+    decoder.decode(bytes.fromhex(POSITION_EVEN), 1.0)
+    assert decoder.global_decodes == 1
+    decoder.decode(bytes.fromhex(POSITION_ODD), 2.0)
+    assert decoder.local_decodes == 1
+    assert store.get('40621D').latitude == pytest.approx(52.2657, abs=1e-3)
+
+def test_beast_framer_escapes():
+    # 0x1a in the MLAT timestamp, the signal level and the message itself
+    message = '8D1A1A902015A678D4D220AA4BDA'
+    framer = BeastFramer()
+    frames = framer.feed(beast(message, mlat=b'\x1a\x00\x1a\x1a\x00\x01', signal=0x1a))
+    assert frames == [bytes.fromhex(message)]
+    assert framer.buffer == bytearray()
+
+def test_beast_framer_other_frame_types():
+    stream = beast('2A00', kind=0x31) + beast('5D406B90D2C3B6', kind=0x32) + beast(IDENTIFICATION)
+    assert BeastFramer().feed(stream) == [bytes.fromhex('2A00'), bytes.fromhex('5D406B90D2C3B6'), bytes.fromhex(IDENTIFICATION)]
+
+def test_beast_framer_resync():
+    # leading garbage, an escaped 0x1a outside a frame, an unknown type and a frame cut short by the next one
+    truncated = beast(VELOCITY)[:12]
+    stream = b'\x00\xff garbage' + b'\x1a\x1a' + b'\x1a\x99\x01\x02' + beast(IDENTIFICATION) + truncated + beast(VELOCITY)
+    assert BeastFramer().feed(stream) == [bytes.fromhex(IDENTIFICATION), bytes.fromhex(VELOCITY)]
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 13, 64])
+def test_beast_framer_split_chunks(size):
+    stream = b''.join(beast(message, mlat=b'\x1a\x1a\x1a\x1a\x1a\x1a', signal=0x1a) for message in VECTORS)
+    framer = BeastFramer()
+    frames = []
+    for position in range(0, len(stream), size):
+        frames += framer.feed(stream[position:position + size])
+    assert frames == [bytes.fromhex(message) for message in VECTORS]
+    assert framer.buffer == bytearray()
+
+def test_raw_framer():
+    stream = (f'*{IDENTIFICATION};\n@0123456789AB{VELOCITY};\r\n{POSITION_ODD}\nnot hex\n\n*{POSITION_EVEN};').encode('ascii')
+    framer = RawFramer()
+    frames = framer.feed(stream[:20]) + framer.feed(stream[20:]) + framer.feed(b'\n')
+    assert frames == [bytes.fromhex(message) for message in (IDENTIFICATION, VELOCITY, POSITION_ODD, POSITION_EVEN)]
+
+async def receive(receiver: ModeSReceiver, store: AircraftStore, count: int) -> None:
+    async def callback(aircraft) -> None:
+        pass
+
+    receiver.register_callback(callback)
+    receiver.start()
+    try:
+        for _ in range(200):
+            if len(store) >= count and store.get('40621D').latitude is not None:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        receiver.stop()
+
+def test_receiver_beast_against_local_server():
+    async def run() -> AircraftStore:
+        async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            # one frame per write, so the even and odd positions arrive in separate reads
+            for message in VECTORS:
+                writer.write(beast(message, mlat=b'\x1a\x00\x00\x00\x00\x1a'))
+                await writer.drain()
+                await asyncio.sleep(0.01)
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(serve, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        store = AircraftStore()
+        async with server:
+            await receive(ModeSReceiver('127.0.0.1', port, format='beast', store=store), store, 3)
+        return store
+
+    check_store(asyncio.run(run()), position_tolerance=0.02)
+
+def test_receiver_raw_against_replay_server(tmp_path):
+    # ads_server.py replays line based files, so raw hex (not Beast binary) goes through it unchanged
+    data_file = tmp_path / 'modes.hex'
+    data_file.write_text(''.join(f'*{message};\n' for message in VECTORS))
+
+    async def run() -> AircraftStore:
+        feed = TCPADSSender('127.0.0.1', 0, data_file=str(data_file), mode='interval', interval=0.01, loop=False)
+        feed_task = asyncio.create_task(feed.start())
+        while feed.server is None or not feed.server.sockets:
+            await asyncio.sleep(0.01)
+        port = feed.server.sockets[0].getsockname()[1]
+        store = AircraftStore()
+        try:
+            await receive(ModeSReceiver('127.0.0.1', port, format='raw', store=store), store, 3)
+        finally:
+            await feed.stop()
+            feed_task.cancel()
+            await asyncio.gather(feed_task, return_exceptions=True)
+        return store
+
+    check_store(asyncio.run(run()), position_tolerance=0.02)
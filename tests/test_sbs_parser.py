@@ -0,0 +1,119 @@
+from dataclasses import astuple
+from datetime import datetime
+from typing import List, Optional
+from src.infrastructure.sbs import SBSParser
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.utils import TimestampAdjuster
+import random
+import pytest
+
+DATA_FILE = 'data/ads_data.log'
+START_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+# lines the sample does not have: not MSG, short, bad numbers, bad timestamps, padding
+EXTRA_LINES = [
+    b'',
+    b'STA,,1,1,E80248,1,1970/01/03,06:18:06.996,1970/01/03,06:18:07.054,,,,,,,,,,,,0',
+    b'MSG,3,1,1,E80248,1,1970/01/03,06:18:06.996',
+    b'MSG,x,1,1,E80248,1,1970/01/03,06:18:06.996,1970/01/03,06:18:07.054,,,,,,,,,,,,0',
+    b'MSG,3,1,1,E80248,1,1970/01/03,06:18:06.996,1970/01/03,06:18:07.054,,12a,,,1.0,2.0,,,,,,0',
+    b'MSG,3,1,1,E80248,1,bad,06:18:06.996,1970/01/03,06:18:07.054,,7000,,,-12.5,-77.1,,,,,,0',
+    b'MSG,2,1,1, E80249 ,1,1970/01/03,06:18:07,1970/01/03,06:18:07.054,,,120.5,90,-12.5,-77.1,,,,,,0',
+    b'MSG,9,1,1,E80248,1,1970/01/03,06:18:06.996,1970/01/03,06:18:07.054,,7000,,,,,,,,,,0',
+    b'MSG,1,1,1,E80248,1,1970/01/03,06:18:06.996,1970/01/03,06:18:07.054,LPE2034 ,,,,,,,,,,,0\r',
+]
+
+def legacy_adjust(adjuster: TimestampAdjuster, str_timestamp: str) -> datetime:
+    # TimestampAdjuster.adjust before the cached fast path
+    try:
+        return adjuster.start_time + (datetime.strptime(str_timestamp, "%Y/%m/%d %H:%M:%S.%f") - adjuster.base_epoch)
+    except Exception:
+        return adjuster.start_time
+
+def legacy_parse(line: bytes, store: AircraftStore, adjuster: TimestampAdjuster) -> Optional[tuple]:
+    # TCPADSReceiver.parse_aircraft before SBSParser, applied to the same kind of store
+    text = line.decode('utf-8', errors='ignore').strip()
+    if not text:
+        return None
+    try:
+        parts = text.strip().split(',')
+        if len(parts) < 22 or not parts[0].startswith('MSG'):
+            return None
+        msg_type = int(parts[1])
+        icao = parts[4].strip()
+        timestamp = legacy_adjust(adjuster, f"{parts[6]} {parts[7]}")
+        callsign = parts[10].strip() or None
+        altitude = int(parts[11]) if parts[11] else None
+        speed = float(parts[12]) if parts[12] else None
+        heading = float(parts[13]) if parts[13] else None
+        latitude = float(parts[14]) if parts[14] else None
+        longitude = float(parts[15]) if parts[15] else None
+        aircraft = store.update(msg_type, icao, timestamp, callsign, altitude, speed, heading, latitude, longitude)
+    except Exception:
+        return None
+    return astuple(aircraft) if aircraft is not None else None
+
+def new_store() -> AircraftStore:
+    return AircraftStore(clock=lambda: 0.0)
+
+def sample() -> List[bytes]:
+    with open(DATA_FILE, 'rb') as f:
+        return f.read().split(b'\n') + EXTRA_LINES
+
+def expected(lines: List[bytes]) -> List[Optional[tuple]]:
+    store, adjuster = new_store(), TimestampAdjuster(START_TIME)
+    return [legacy_parse(line, store, adjuster) for line in lines]
+
+def parse_states(parser: SBSParser, lines: List[bytes]) -> List[Optional[tuple]]:
+    states = []
+    for line in lines:
+        aircraft = parser.parse_line(line.strip())
+        states.append(astuple(aircraft) if aircraft is not None else None)
+    return states
+
+def test_parse_line_matches_legacy():
+    lines = sample()
+    parser = SBSParser(new_store(), TimestampAdjuster(START_TIME))
+    assert parse_states(parser, lines) == expected(lines)
+    assert parser.lines > 2000
+
+def test_parse_aircraft_text_matches_legacy():
+    lines = sample()
+    parser = SBSParser(new_store(), TimestampAdjuster(START_TIME))
+    states = []
+    for line in lines:
+        aircraft = parser.parse_aircraft(line.decode('utf-8', errors='ignore'))
+        states.append(astuple(aircraft) if aircraft is not None else None)
+    assert states == expected(lines)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_chunks_match_legacy(seed):
+    lines = sample()
+    data = b'\n'.join(lines)
+    rng = random.Random(seed)
+    parser = SBSParser(new_store(), TimestampAdjuster(START_TIME))
+    split_lines = []
+    position = 0
+    while position < len(data):
+        size = rng.choice([1, 2, 7, 64, 1000, rng.randrange(1, 65536)])
+        split_lines += parser.split(data[position:position + size])
+        position += size
+    split_lines.append(parser.remainder)
+    assert split_lines == lines
+    assert parse_states(parser, split_lines) == expected(lines)
+
+def test_parse_many_keeps_order_and_final_state():
+    lines = sample()
+    data = b'\n'.join(lines) + b'\n'
+    store = new_store()
+    parser = SBSParser(store, TimestampAdjuster(START_TIME))
+    icaos = []
+    for position in range(0, len(data), 4096):
+        icaos += [aircraft.icao for aircraft in parser.parse_many(data[position:position + 4096])]
+
+    legacy_store = new_store()
+    adjuster = TimestampAdjuster(START_TIME)
+    legacy_icaos = [state[0] for state in (legacy_parse(line, legacy_store, adjuster) for line in lines) if state is not None]
+    assert icaos == legacy_icaos
+    assert {icao: astuple(aircraft) for icao, aircraft in store.aircrafts.items()} == \
+           {icao: astuple(aircraft) for icao, aircraft in legacy_store.aircrafts.items()}
@@ -0,0 +1,154 @@
+from math import asin, atan2, cos, degrees, radians, sin
+from typing import List, Optional, Tuple
+from src.infrastructure.subscriptions import EARTH_RADIUS_KM, Subscription, SubscriptionIndex
+import random
+import pytest
+
+Point = Tuple[Optional[int], Optional[float], Optional[float]]
+
+def destination(lat: float, lon: float, bearing: float, km: float) -> Tuple[float, float]:
+    distance, lat, lon, bearing = km / EARTH_RADIUS_KM, radians(lat), radians(lon), radians(bearing)
+    lat2 = asin(sin(lat) * cos(distance) + cos(lat) * sin(distance) * cos(bearing))
+    lon2 = lon + atan2(sin(bearing) * sin(distance) * cos(lat), cos(distance) - sin(lat) * sin(lat2))
+    return degrees(lat2), (degrees(lon2) + 540) % 360 - 180
+
+def random_subscription(rng: random.Random) -> Subscription:
+    kind = rng.choice(['all', 'mmsi', 'bbox', 'antimeridian', 'polar', 'radius', 'radius_polar', 'radius_antimeridian', 'radius_wide'])
+    if kind == 'all':
+        return Subscription()
+    if kind == 'mmsi':
+        return Subscription('mmsi', mmsis=rng.sample(range(100), rng.randint(1, 5)))
+    if kind in ('bbox', 'antimeridian', 'polar'):
+        lat_min, lat_max = sorted(rng.uniform(-90, 90) for _ in range(2))
+        if kind == 'polar':
+            lat_min, lat_max = rng.choice([(lat_min, 90.0), (-90.0, lat_max)])
+        lon_min, lon_max = sorted(rng.uniform(-180, 180) for _ in range(2))
+        if kind == 'antimeridian':
+            lon_min, lon_max = lon_max, lon_min
+        return Subscription('bbox', bbox=(lat_min, lon_min, lat_max, lon_max))
+    lat, lon = rng.uniform(-89, 89), rng.uniform(-180, 180)
+    radius = rng.uniform(1, 1500)
+    if kind == 'radius_polar':
+        lat = rng.choice([1, -1]) * rng.uniform(80, 90)
+    elif kind == 'radius_antimeridian':
+        lon = rng.choice([rng.uniform(170, 180), rng.uniform(-180, -170)])
+    elif kind == 'radius_wide':
+        radius = rng.uniform(3000, 20000)
+    return Subscription('radius', center=(lat, lon), radius=radius)
+
+def points_for(subscription: Subscription, rng: random.Random) -> List[Point]:
+    # corners and edges of the area, where cell and matches rounding meet
+    points: List[Point] = []
+    if subscription.kind == 'bbox':
+        lat_min, lon_min, lat_max, lon_max = subscription.bbox
+        for lat in (lat_min, lat_max, (lat_min + lat_max) / 2):
+            for lon in (lon_min, lon_max, 180.0, -180.0):
+                points.append((None, lat, lon))
+    elif subscription.kind == 'radius':
+        lat, lon = subscription.center
+        points.append((None, lat, lon))
+        for bearing in range(0, 360, 15):
+            for scale in (0.5, 0.999, 0.9999999, 1.0000001):
+                points.append((None, *destination(lat, lon, bearing + rng.random(), subscription.radius * scale)))
+    return points
+
+def brute_force(subscriptions: List[Subscription], point: Point) -> set:
+    return {client for client, subscription in enumerate(subscriptions) if subscription.matches(*point)}
+
+@pytest.mark.parametrize('cell_size, max_cells', [(1.0, 4096), (0.5, 4096), (7.0, 4096), (45.0, 4096), (1.0, 50)])
+@pytest.mark.parametrize('seed', range(3))
+def test_route_matches_brute_force(cell_size, max_cells, seed):
+    rng = random.Random(seed)
+    subscriptions = [random_subscription(rng) for _ in range(60)]
+    index = SubscriptionIndex(cell_size, max_cells)
+    for client, subscription in enumerate(subscriptions):
+        index.subscribe(client, subscription)
+
+    points: List[Point] = [(rng.randrange(100), rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(2000)]
+    points += [(None, lat, lon) for lat in (-90.0, -89.999, 0.0, 89.999, 90.0) for lon in (-180.0, -179.999, 0.0, 179.999, 180.0)]
+    points += [(rng.randrange(100), None, None) for _ in range(50)]
+    for subscription in subscriptions:
+        points += points_for(subscription, rng)
+    for point in points:
+        assert index.route(*point) == brute_force(subscriptions, point), point
+
+def test_unsubscribe_cleans_up():
+    rng = random.Random(7)
+    index = SubscriptionIndex(1.0, 500)
+    for client in range(40):
+        index.subscribe(client, random_subscription(rng))
+    # resubscribing replaces the previous area
+    for client in range(40):
+        index.subscribe(client, random_subscription(rng))
+    for client in range(40):
+        index.unsubscribe(client)
+    index.unsubscribe('unknown')
+    assert len(index) == 0
+    assert not index.cells and not index.by_mmsi and not index.everyone and not index.wide
+    assert not index.filtered
+
+@pytest.mark.parametrize('cell_size', [1.0, 7.0])
+def test_cells_for_covers_bounds(cell_size):
+    rng = random.Random(11)
+    index = SubscriptionIndex(cell_size, max_cells=1 << 30)
+    for _ in range(100):
+        subscription = random_subscription(rng)
+        bounds = subscription.bounds()
+        if bounds is None:
+            continue
+        cells = set(index.cells_for(bounds))
+        for _, lat, lon in points_for(subscription, rng) + [(None, rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(200)]:
+            if subscription.matches(None, lat, lon):
+                assert index.cell(lat, lon) in cells, (subscription, lat, lon)
+
+def test_cells_for_antimeridian_and_limit():
+    index = SubscriptionIndex(1.0, max_cells=100)
+    assert index.cells_for((10.0, 179.5, 10.5, -179.5)) == [(10, 179), (10, 180), (10, -180)]
+    assert index.cells_for((0.0, 0.0, 9.0, 9.0)) == [(row, column) for row in range(10) for column in range(10)]
+    assert index.cells_for((0.0, 0.0, 10.0, 9.0)) is None
+
+def test_filtered():
+    index = SubscriptionIndex()
+    index.subscribe('a', Subscription())
+    assert not index.filtered
+    index.subscribe('b', Subscription('mmsi', mmsis=[1]))
+    assert index.filtered
+
+@pytest.mark.parametrize('line, expected', [
+    ('ALL', 'Subscription(all)'),
+    ('all\n', 'Subscription(all)'),
+    ('BBOX 40 -5 52 10', 'Subscription(bbox=(40.0, -5.0, 52.0, 10.0))'),
+    ('bbox 40,170,52,-170', 'Subscription(bbox=(40.0, 170.0, 52.0, -170.0))'),
+    ('RADIUS 48.85 2.35 250', 'Subscription(center=(48.85, 2.35), radius=250.0)'),
+    ('MMSI 227006760, 4221200', 'Subscription(mmsis=[4221200, 227006760])'),
+])
+def test_parse(line, expected):
+    assert repr(Subscription.parse(line)) == expected
+
+@pytest.mark.parametrize('line', [
+    '',
+    '   \n',
+    'ALL 1',
+    'NEAR 48 2',
+    'BBOX 40 -5 52',
+    'BBOX 40 -5 52 10 11',
+    'BBOX 52 -5 40 10',
+    'BBOX -91 -5 40 10',
+    'BBOX 40 -181 52 10',
+    'BBOX 40 -5 52 north',
+    'RADIUS 48 2',
+    'RADIUS 48 2 0',
+    'RADIUS 48 2 -5',
+    'RADIUS 91 2 10',
+    'RADIUS 48 200 10',
+    'MMSI',
+    'MMSI 1.5',
+    'MMSI abc',
+])
+def test_parse_errors(line):
+    with pytest.raises(ValueError):
+        Subscription.parse(line)
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        Subscription('polygon')
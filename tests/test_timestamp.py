@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import List, Tuple
+from src.infrastructure.utils import TimestampAdjuster
+import pytest
+
+DATA_FILE = 'data/ads_data.log'
+START_TIME = datetime(2024, 1, 1, 12, 0, 0, 250000)
+
+# fall back to strptime, or to start_time when strptime fails too
+FALLBACK_CASES = [
+    ('1970/01/03', '06:18:07'),
+    ('1970/1/3', '6:18:07.5'),
+    ('1970/01/03', '6:18:07.500'),
+    ('1970/01/03', '06:18:07.1234567'),
+    ('1970/01/03', '24:00:00.000'),
+    ('1970/01/03', '23:60:00.000'),
+    ('1970/01/03', '06:18:07.-12'),
+    ('1970/01/03', '06-18-07.123'),
+    ('1970/13/03', '06:18:07.123'),
+    ('bad', 'date'),
+    ('', ''),
+]
+EDGE_CASES = [
+    ('1970/01/01', '00:00:00.000'),
+    ('1970/01/03', '23:59:59.999'),
+    ('1970/01/03', '06:18:07.1'),
+    ('1970/01/03', '06:18:07.123456'),
+    ('2024/02/29', '12:34:56.789'),
+    ('1969/12/31', '23:59:59.999'),
+]
+
+def strptime_adjust(adjuster: TimestampAdjuster, str_timestamp: str) -> datetime:
+    # TimestampAdjuster.adjust before the cached fast path
+    try:
+        return adjuster.start_time + (datetime.strptime(str_timestamp, "%Y/%m/%d %H:%M:%S.%f") - adjuster.base_epoch)
+    except ValueError:
+        return adjuster.start_time
+
+def sample_pairs() -> List[Tuple[str, str]]:
+    # both the generated and the logged date / time of every line
+    pairs = []
+    with open(DATA_FILE, 'r') as f:
+        for line in f:
+            parts = line.strip().split(',')
+            if len(parts) >= 10:
+                pairs.append((parts[6], parts[7]))
+                pairs.append((parts[8], parts[9]))
+    return pairs
+
+def check(adjuster: TimestampAdjuster, date: str, clock: str) -> None:
+    expected = strptime_adjust(adjuster, f"{date} {clock}")
+    assert adjuster.adjust(f"{date} {clock}") == expected
+    assert adjuster.adjust_parts(date, clock) == expected
+    assert adjuster.adjust_parts(date, clock, output='datetime') == expected
+    assert adjuster.adjust_parts(date, clock, output='float') == pytest.approx(expected.timestamp(), abs=1e-6)
+    assert adjuster.adjust_parts(date, clock, output='int') == round(expected.timestamp() * 1_000_000) // 1000
+
+def test_sample_matches_strptime():
+    adjuster = TimestampAdjuster(START_TIME)
+    pairs = sample_pairs()
+    assert len(pairs) > 4000
+    for date, clock in pairs:
+        check(adjuster, date, clock)
+
+@pytest.mark.parametrize('date, clock', EDGE_CASES + FALLBACK_CASES)
+def test_edge_and_fallback_cases_match_strptime(date, clock):
+    check(TimestampAdjuster(START_TIME), date, clock)
+
+def test_unparseable_timestamp_falls_back_to_start_time():
+    adjuster = TimestampAdjuster(START_TIME)
+    assert adjuster.adjust('bad date') == START_TIME
+    assert adjuster.adjust_parts('1970/01/03', '24:00:00.000') == START_TIME
+    assert adjuster.adjust_parts('bad', 'date', output='int') == round(START_TIME.timestamp() * 1_000_000) // 1000
+
+def test_date_cache_is_bounded():
+    adjuster = TimestampAdjuster(START_TIME, date_cache_size=4)
+    for day in range(1, 29):
+        check(adjuster, f'1970/02/{day:02d}', '01:02:03.456')
+        assert len(adjuster.dates) <= 4
+
+def test_unknown_output():
+    with pytest.raises(ValueError):
+        TimestampAdjuster(START_TIME).adjust_parts('1970/01/03', '06:18:07.123', output='str')
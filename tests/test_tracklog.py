@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+from typing import List
+from src.domain.models import Aircraft
+from src.infrastructure.store import AircraftStore
+from src.infrastructure.tracklog import HEADER, RECORD, TrackLogReader, TrackLogWriter, restore
+import os
+import pytest
+
+NOW = 1_700_000_000.0
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+def aircraft(icao: str, second: float = 0.0, **fields) -> Aircraft:
+    values = dict(callsign=f'T{icao[:5]}', altitude=35000, latitude=48.5, longitude=2.25, heading=90.5, speed=420)
+    values.update(fields)
+    return Aircraft(icao=icao, timestamp=START + timedelta(seconds=second), **values)
+
+def write(writer: TrackLogWriter, states: List[Aircraft], seen: float) -> None:
+    # what append() queues, with a chosen wall clock time instead of time.time()
+    for state in states:
+        writer.pending.append((seen, state.timestamp, state.icao, state.callsign, state.altitude,
+                               state.latitude, state.longitude, state.heading, state.speed))
+    writer.flush()
+
+def restored(path: str, max_age: float = 300.0, now: float = NOW) -> AircraftStore:
+    store = AircraftStore()
+    restore(path, store, max_age, now=now)
+    return store
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = TrackLogWriter(str(tmp_path / 'logs' / 'track.log'), max_bytes=1 << 20)
+    writer.open()
+    yield writer
+    writer.stop()
+
+def test_round_trip_with_missing_fields(writer):
+    states = [
+        aircraft('4CA7B5', 0.125),
+        aircraft('3C6DD2', 1.5, callsign=None, altitude=None),
+        aircraft('A1B2C3', 2.0, latitude=None, longitude=None, heading=None, speed=None),
+        aircraft('E80261', 3.0, callsign=None, altitude=None, latitude=None, longitude=None, heading=None, speed=None),
+    ]
+    for state in states:
+        writer.append(state)
+    writer.flush()
+    writer.stop()
+
+    reader = TrackLogReader(writer.path)
+    try:
+        assert len(reader) == len(states)
+        assert list(reader) == states
+    finally:
+        reader.close()
+    store = restored(writer.path, now=None)
+    assert {icao: state for icao, state in store.aircrafts.items()} == {state.icao: state for state in states}
+
+def test_in_place_updates_are_copied(writer):
+    state = aircraft('4CA7B5')
+    writer.append(state)
+    state.altitude = 1000
+    writer.append(state)
+    writer.flush()
+    writer.stop()
+    reader = TrackLogReader(writer.path)
+    try:
+        assert [logged.altitude for logged in reader] == [35000, 1000]
+    finally:
+        reader.close()
+
+def test_max_age_cutoff(writer):
+    write(writer, [aircraft('4CA7B5'), aircraft('3C6DD2')], seen=NOW - 400)
+    write(writer, [aircraft('3C6DD2', 5.0, altitude=36000)], seen=NOW - 100)
+    write(writer, [aircraft('A1B2C3')], seen=NOW - 300)
+    writer.stop()
+    store = restored(writer.path, max_age=300.0)
+    assert sorted(store.aircrafts) == ['3C6DD2', 'A1B2C3']
+    assert store.get('3C6DD2').altitude == 36000
+    assert len(restored(writer.path, max_age=50.0)) == 0
+    assert len(restored(writer.path, max_age=1000.0)) == 3
+
+def test_rotation_newest_wins(tmp_path):
+    # room for the header and three records, the file rotates on the flush after it is full
+    writer = TrackLogWriter(str(tmp_path / 'track.log'), max_bytes=HEADER.itemsize + 3 * RECORD.itemsize)
+    writer.open()
+    write(writer, [aircraft('4CA7B5', 0.0, altitude=1000), aircraft('3C6DD2', 0.0, altitude=2000)], seen=NOW - 50)
+    write(writer, [aircraft('A1B2C3', 1.0, altitude=3000)], seen=NOW - 40)
+    assert writer.rotations == 0
+    write(writer, [aircraft('4CA7B5', 2.0, altitude=1100), aircraft('E80261', 2.0, altitude=4000)], seen=NOW - 30)
+    write(writer, [aircraft('3C6DD2', 3.0, altitude=2100)], seen=NOW - 20)
+    writer.stop()
+    assert writer.rotations == 1
+    assert os.path.exists(f'{writer.path}.1')
+
+    store = restored(writer.path)
+    assert {icao: state.altitude for icao, state in store.aircrafts.items()} == {'4CA7B5': 1100, '3C6DD2': 2100, 'A1B2C3': 3000, 'E80261': 4000}
+    # oldest first, so a full store keeps the ones seen last
+    assert list(store.aircrafts) == ['A1B2C3', '4CA7B5', 'E80261', '3C6DD2']
+    assert store.get('4CA7B5').timestamp == START + timedelta(seconds=2)
+
+def test_rotated_file_alone(tmp_path):
+    writer = TrackLogWriter(str(tmp_path / 'track.log'), max_bytes=HEADER.itemsize + RECORD.itemsize)
+    writer.open()
+    write(writer, [aircraft('4CA7B5', altitude=1000)], seen=NOW - 10)
+    writer.rotate()
+    writer.stop()
+    assert sorted(restored(writer.path).aircrafts) == ['4CA7B5']
+    os.remove(writer.path)
+    assert sorted(restored(writer.path).aircrafts) == ['4CA7B5']
+
+def test_truncated_trailing_record(writer):
+    write(writer, [aircraft('4CA7B5', altitude=1000), aircraft('3C6DD2', altitude=2000)], seen=NOW - 10)
+    writer.stop()
+    size = os.path.getsize(writer.path)
+    with open(writer.path, 'r+b') as f:
+        f.truncate(size - RECORD.itemsize // 2)
+    reader = TrackLogReader(writer.path)
+    try:
+        assert len(reader) == 1
+    finally:
+        reader.close()
+    assert sorted(restored(writer.path).aircrafts) == ['4CA7B5']
+
+    # a restart cuts the partial record before appending, so the new records stay aligned
+    writer.open()
+    write(writer, [aircraft('A1B2C3', altitude=3000)], seen=NOW - 5)
+    writer.stop()
+    assert os.path.getsize(writer.path) == HEADER.itemsize + 2 * RECORD.itemsize
+    store = restored(writer.path)
+    assert {icao: state.altitude for icao, state in store.aircrafts.items()} == {'4CA7B5': 1000, 'A1B2C3': 3000}
+
+def test_truncated_header(tmp_path):
+    path = str(tmp_path / 'track.log')
+    with open(path, 'wb') as f:
+        f.write(b'ADSB')
+    writer = TrackLogWriter(path)
+    writer.open()
+    write(writer, [aircraft('4CA7B5')], seen=NOW - 5)
+    writer.stop()
+    assert sorted(restored(path).aircrafts) == ['4CA7B5']
+
+def test_bad_files_are_skipped(tmp_path):
+    path = str(tmp_path / 'track.log')
+    assert restore(path, AircraftStore(), 300.0, now=NOW) == 0
+    with open(path, 'wb') as f:
+        f.write(b'ADSB')
+    assert restore(path, AircraftStore(), 300.0, now=NOW) == 0
+    with open(path, 'wb') as f:
+        f.write(b'NOTATRACKLOG' + bytes(RECORD.itemsize))
+    assert restore(path, AircraftStore(), 300.0, now=NOW) == 0
+    with pytest.raises(ValueError):
+        TrackLogReader(path)
+
+def test_restore_keeps_live_and_respects_max_size(writer):
+    write(writer, [aircraft(f'{i:06X}', float(i)) for i in range(5)], seen=NOW - 10)
+    writer.stop()
+    store = AircraftStore(max_size=3)
+    live = aircraft('000000', altitude=1)
+    store.aircrafts['000000'] = live
+    store.last_seen['000000'] = 0.0
+    assert restore(writer.path, store, 300.0, now=NOW) == 2
+    assert store.get('000000') is live
+    assert len(store) == 3